@@ -1,9 +1,12 @@
 import tkinter as tk
 from src.services.database import init_database
+from src.services.log import configure_logging
+from src.services.event_bus import get_event_bus
 from src.auth.login import LoginWindow
 
 
 def main():
+    configure_logging()
     print("Inicializando banco de dados...")
     init_database()
     print("Banco de dados inicializado com sucesso!")
@@ -11,6 +14,7 @@ def main():
     
     root = tk.Tk()
     root.withdraw()
+    get_event_bus().start(root)
     
     login_window = LoginWindow(root)
     
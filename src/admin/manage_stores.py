@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox
 import sqlite3
 import re
 from src.services.database import get_db
+from src.services.catalog_cache import get_catalog_cache
 
 
 class ManageStoresWindow:
@@ -165,6 +166,7 @@ class ManageStoresWindow:
             try:
                 cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
                 conn.commit()
+                get_catalog_cache().invalidate_store(store_id)
                 messagebox.showinfo("Sucesso", "Loja excluída com sucesso!")
                 self._load_stores()
             except sqlite3.Error as e:
@@ -302,8 +304,10 @@ class CreateStoreWindow:
                 "INSERT INTO stores (user_id, name, description) VALUES (?, ?, ?)",
                 (user_id, name, description if description else None)
             )
+            store_id = cursor.lastrowid
             
             conn.commit()
+            get_catalog_cache().invalidate_store(store_id)
             messagebox.showinfo("Sucesso", "Loja criada com sucesso!")
             self.window.destroy()
             if self.callback:
@@ -457,6 +461,7 @@ class EditStoreWindow:
             )
             
             conn.commit()
+            get_catalog_cache().invalidate_store(self.store_id)
             messagebox.showinfo("Sucesso", "Loja atualizada com sucesso!")
             self.window.destroy()
             if self.callback:
@@ -2,6 +2,15 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import sqlite3
 from src.services.database import get_db
+from src.services.query_executor import get_query_executor
+
+
+USERS_BY_TYPE_SQL = """
+    SELECT id, name, email, user_type, is_active, is_blocked, created_at
+    FROM users
+    WHERE user_type = ?
+    ORDER BY created_at DESC
+"""
 
 
 class ManageUsersWindow:
@@ -128,47 +137,51 @@ class ManageUsersWindow:
             "Admin": "admin"
         }
         
-        db = get_db()
-        conn = db.get_connection()
+        get_query_executor().submit(
+            self.window,
+            "admin.users",
+            lambda conn: self._fetch_users(conn, type_map[filter_type]),
+            self._render_users,
+            lambda e: messagebox.showerror("Erro", f"Erro ao carregar usuários: {str(e)}")
+        )
+    
+    def _fetch_users(self, conn, user_type):
         cursor = conn.cursor()
         
-        try:
-            if type_map[filter_type]:
-                cursor.execute("""
-                    SELECT id, name, email, user_type, is_active, is_blocked, created_at
-                    FROM users
-                    WHERE user_type = ?
-                    ORDER BY created_at DESC
-                """, (type_map[filter_type],))
-            else:
-                cursor.execute("""
-                    SELECT id, name, email, user_type, is_active, is_blocked, created_at
-                    FROM users
-                    ORDER BY created_at DESC
-                """)
+        if user_type:
+            cursor.execute(USERS_BY_TYPE_SQL, (user_type,))
+        else:
+            cursor.execute("""
+                SELECT id, name, email, user_type, is_active, is_blocked, created_at
+                FROM users
+                ORDER BY created_at DESC
+            """)
+        
+        return cursor.fetchall()
+    
+    def _render_users(self, users):
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        
+        user_type_map = {
+            "client": "Cliente",
+            "store": "Loja",
+            "admin": "Admin"
+        }
+        
+        for user in users:
+            status = "Ativo" if user['is_active'] else "Inativo"
+            blocked = "Sim" if user['is_blocked'] else "Não"
             
-            users = cursor.fetchall()
-            for user in users:
-                user_type_map = {
-                    "client": "Cliente",
-                    "store": "Loja",
-                    "admin": "Admin"
-                }
-                
-                status = "Ativo" if user['is_active'] else "Inativo"
-                blocked = "Sim" if user['is_blocked'] else "Não"
-                
-                self.tree.insert("", "end", values=(
-                    user['id'],
-                    user['name'],
-                    user['email'],
-                    user_type_map.get(user['user_type'], user['user_type']),
-                    status,
-                    blocked,
-                    user['created_at']
-                ), tags=(user['id'],))
-        except sqlite3.Error as e:
-            messagebox.showerror("Erro", f"Erro ao carregar usuários: {str(e)}")
+            self.tree.insert("", "end", values=(
+                user['id'],
+                user['name'],
+                user['email'],
+                user_type_map.get(user['user_type'], user['user_type']),
+                status,
+                blocked,
+                user['created_at']
+            ), tags=(user['id'],))
     
     def _get_selected_user_id(self):
         selected = self.tree.selection()
@@ -258,5 +271,6 @@ class ManageUsersWindow:
                 messagebox.showerror("Erro", f"Erro ao excluir usuário: {str(e)}")
     
     def _on_close(self):
+        get_query_executor().cancel(self.window)
         self.window.destroy()
 
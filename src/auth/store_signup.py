@@ -3,6 +3,7 @@ from tkinter import messagebox
 import re
 import sqlite3
 from src.services.database import get_db
+from src.services.catalog_cache import get_catalog_cache
 
 
 class StoreSignupWindow:
@@ -184,8 +185,10 @@ class StoreSignupWindow:
                 "INSERT INTO stores (user_id, name) VALUES (?, ?)",
                 (user_id, name)
             )
+            store_id = cursor.lastrowid
             
             conn.commit()
+            get_catalog_cache().invalidate_store(store_id)
             
             messagebox.showinfo("Sucesso", "Loja cadastrada com sucesso!")
             self.window.destroy()
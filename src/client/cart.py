@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox
-from src.services.cart_service import CartService
+from src.services.cart_service import get_cart_service
 from src.client.payment import PaymentWindow
 
 
@@ -10,10 +10,14 @@ class CartPage:
         self.parent = parent
         self.user_data = user_data
         self.dashboard_ref = dashboard_ref
-        self.cart_service = CartService()
+        self.cart_service = get_cart_service(self.user_data['id'])
         
         self._create_widgets()
         self._load_cart()
+        
+        # A página reage às mudanças do carrinho em vez de se redesenhar inteira
+        self.cart_service.subscribe(self._on_cart_change)
+        self.items_frame.bind("<Destroy>", self._on_destroy)
     
     def _create_widgets(self):
         header_frame = tk.Frame(self.parent, bg="#4CAF50", height=80)
@@ -88,135 +92,178 @@ class CartPage:
     def _load_cart(self):
         for widget in self.items_frame.winfo_children():
             widget.destroy()
+        self.store_frames = {}
+        self.item_rows = {}
+        self.empty_label = None
         
-        cart = self.cart_service.get_cart()
+        stores = self.cart_service.get_stores_in_cart()
+        for store_id, store_data in stores.items():
+            self._create_store_frame(store_id, store_data['store_name'])
+            for item in store_data['items']:
+                self._create_item_row(item)
         
-        if not cart:
-            empty_label = tk.Label(
-                self.items_frame,
-                text="Seu carrinho está vazio.",
-                font=("Arial", 14),
-                bg="white",
-                fg="#757575"
-            )
-            empty_label.pack(pady=50)
-            self.total_label.config(text="Total: R$ 0,00")
+        self._update_summary()
+    
+    def _on_cart_change(self, event):
+        # Só a linha afetada e o total são atualizados; "cleared" refaz a lista
+        if event.kind == "cleared":
+            self._load_cart()
             return
         
-        stores = self.cart_service.get_stores_in_cart()
+        if event.kind == "added":
+            if event.store_id not in self.store_frames:
+                self._create_store_frame(event.store_id, event.item['store_name'])
+            self._create_item_row(event.item)
+        elif event.kind == "updated":
+            self._bind_item_row(self.item_rows[event.product_id], event.item)
+        elif event.kind == "removed":
+            self.item_rows.pop(event.product_id).destroy()
+            if event.store_id not in self.cart_service.get_stores_in_cart():
+                self.store_frames.pop(event.store_id).destroy()
         
-        for store_id, store_data in stores.items():
-            store_frame = tk.Frame(self.items_frame, bg="white", relief="solid", bd=1)
-            store_frame.pack(fill="x", padx=10, pady=10)
-            
-            store_header = tk.Frame(store_frame, bg="#FF9800", height=40)
-            store_header.pack(fill="x")
-            store_header.pack_propagate(False)
-            
-            store_name_label = tk.Label(
-                store_header,
-                text=f"🏪 {store_data['store_name']}",
-                font=("Arial", 14, "bold"),
-                bg="#FF9800",
-                fg="white"
-            )
-            store_name_label.pack(pady=8)
-            
-            for item in store_data['items']:
-                item_frame = tk.Frame(store_frame, bg="#f5f5f5", relief="solid", bd=1)
-                item_frame.pack(fill="x", padx=5, pady=5)
-                
-                item_info = tk.Frame(item_frame, bg="#f5f5f5")
-                item_info.pack(fill="x", padx=10, pady=10)
-                
-                name_label = tk.Label(
-                    item_info,
-                    text=item['product_name'],
-                    font=("Arial", 12, "bold"),
-                    bg="#f5f5f5",
-                    anchor="w"
-                )
-                name_label.pack(fill="x")
-                
-                controls_frame = tk.Frame(item_info, bg="#f5f5f5")
-                controls_frame.pack(fill="x", pady=5)
-                
-                quantity_frame = tk.Frame(controls_frame, bg="#f5f5f5")
-                quantity_frame.pack(side="left")
-                
-                qty_label = tk.Label(
-                    quantity_frame,
-                    text="Quantidade:",
-                    font=("Arial", 10),
-                    bg="#f5f5f5"
-                )
-                qty_label.pack(side="left", padx=5)
-                
-                minus_btn = tk.Button(
-                    quantity_frame,
-                    text="-",
-                    font=("Arial", 10, "bold"),
-                    width=3,
-                    command=lambda pid=item['product_id'], qty=item['quantity']-1: self._update_quantity(pid, qty)
-                )
-                minus_btn.pack(side="left", padx=2)
-                
-                qty_value = tk.Label(
-                    quantity_frame,
-                    text=str(item['quantity']),
-                    font=("Arial", 12, "bold"),
-                    bg="#f5f5f5",
-                    width=3
-                )
-                qty_value.pack(side="left", padx=2)
-                
-                plus_btn = tk.Button(
-                    quantity_frame,
-                    text="+",
-                    font=("Arial", 10, "bold"),
-                    width=3,
-                    command=lambda pid=item['product_id'], qty=item['quantity']+1: self._update_quantity(pid, qty)
-                )
-                plus_btn.pack(side="left", padx=2)
-                
-                price_frame = tk.Frame(controls_frame, bg="#f5f5f5")
-                price_frame.pack(side="right")
-                
-                item_total = item['price'] * item['quantity']
-                price_label = tk.Label(
-                    price_frame,
-                    text=f"R$ {item_total:.2f}",
-                    font=("Arial", 14, "bold"),
-                    bg="#f5f5f5",
-                    fg="#4CAF50"
-                )
-                price_label.pack(side="left", padx=10)
-                
-                remove_btn = tk.Button(
-                    price_frame,
-                    text="🗑️",
-                    font=("Arial", 10),
-                    bg="#F44336",
-                    fg="white",
-                    command=lambda pid=item['product_id']: self._remove_item(pid)
+        self._update_summary()
+    
+    def _on_destroy(self, event):
+        if event.widget is self.items_frame:
+            self.cart_service.unsubscribe(self._on_cart_change)
+    
+    def _update_summary(self):
+        if not self.cart_service.get_cart():
+            if self.empty_label is None:
+                self.empty_label = tk.Label(
+                    self.items_frame,
+                    text="Seu carrinho está vazio.",
+                    font=("Arial", 14),
+                    bg="white",
+                    fg="#757575"
                 )
-                remove_btn.pack(side="left", padx=5)
+                self.empty_label.pack(pady=50)
+            self.total_label.config(text="Total: R$ 0,00")
+            return
+        
+        if self.empty_label is not None:
+            self.empty_label.destroy()
+            self.empty_label = None
         
         total = self.cart_service.get_total()
         self.total_label.config(text=f"Total: R$ {total:.2f}")
     
-    def _update_quantity(self, product_id, quantity):
-        self.cart_service.update_quantity(product_id, quantity)
-        self._load_cart()
+    def _create_store_frame(self, store_id, store_name):
+        store_frame = tk.Frame(self.items_frame, bg="white", relief="solid", bd=1)
+        store_frame.pack(fill="x", padx=10, pady=10)
+        
+        store_header = tk.Frame(store_frame, bg="#FF9800", height=40)
+        store_header.pack(fill="x")
+        store_header.pack_propagate(False)
+        
+        store_name_label = tk.Label(
+            store_header,
+            text=f"🏪 {store_name}",
+            font=("Arial", 14, "bold"),
+            bg="#FF9800",
+            fg="white"
+        )
+        store_name_label.pack(pady=8)
+        
+        self.store_frames[store_id] = store_frame
+        return store_frame
+    
+    def _create_item_row(self, item):
+        item_frame = tk.Frame(self.store_frames[item['store_id']], bg="#f5f5f5", relief="solid", bd=1)
+        item_frame.pack(fill="x", padx=5, pady=5)
+        
+        item_info = tk.Frame(item_frame, bg="#f5f5f5")
+        item_info.pack(fill="x", padx=10, pady=10)
+        
+        name_label = tk.Label(
+            item_info,
+            text=item['product_name'],
+            font=("Arial", 12, "bold"),
+            bg="#f5f5f5",
+            anchor="w"
+        )
+        name_label.pack(fill="x")
+        
+        controls_frame = tk.Frame(item_info, bg="#f5f5f5")
+        controls_frame.pack(fill="x", pady=5)
+        
+        quantity_frame = tk.Frame(controls_frame, bg="#f5f5f5")
+        quantity_frame.pack(side="left")
+        
+        qty_label = tk.Label(
+            quantity_frame,
+            text="Quantidade:",
+            font=("Arial", 10),
+            bg="#f5f5f5"
+        )
+        qty_label.pack(side="left", padx=5)
+        
+        minus_btn = tk.Button(
+            quantity_frame,
+            text="-",
+            font=("Arial", 10, "bold"),
+            width=3,
+            command=lambda pid=item['product_id']: self._change_quantity(pid, -1)
+        )
+        minus_btn.pack(side="left", padx=2)
+        
+        item_frame.qty_value = tk.Label(
+            quantity_frame,
+            font=("Arial", 12, "bold"),
+            bg="#f5f5f5",
+            width=3
+        )
+        item_frame.qty_value.pack(side="left", padx=2)
+        
+        plus_btn = tk.Button(
+            quantity_frame,
+            text="+",
+            font=("Arial", 10, "bold"),
+            width=3,
+            command=lambda pid=item['product_id']: self._change_quantity(pid, 1)
+        )
+        plus_btn.pack(side="left", padx=2)
+        
+        price_frame = tk.Frame(controls_frame, bg="#f5f5f5")
+        price_frame.pack(side="right")
+        
+        item_frame.price_label = tk.Label(
+            price_frame,
+            font=("Arial", 14, "bold"),
+            bg="#f5f5f5",
+            fg="#4CAF50"
+        )
+        item_frame.price_label.pack(side="left", padx=10)
+        
+        remove_btn = tk.Button(
+            price_frame,
+            text="🗑️",
+            font=("Arial", 10),
+            bg="#F44336",
+            fg="white",
+            command=lambda pid=item['product_id']: self._remove_item(pid)
+        )
+        remove_btn.pack(side="left", padx=5)
+        
+        self._bind_item_row(item_frame, item)
+        self.item_rows[item['product_id']] = item_frame
+        return item_frame
+    
+    def _bind_item_row(self, item_frame, item):
+        item_frame.qty_value.config(text=str(item['quantity']))
+        item_frame.price_label.config(text=f"R$ {item['price'] * item['quantity']:.2f}")
+    
+    def _change_quantity(self, product_id, delta):
+        item = self.cart_service.get_item(product_id)
+        if item is not None:
+            self.cart_service.update_quantity(product_id, item['quantity'] + delta)
     
     def _remove_item(self, product_id):
         self.cart_service.remove_item(product_id)
-        self._load_cart()
     
     def _clear_cart(self):
         if messagebox.askyesno("Confirmar", "Deseja limpar todo o carrinho?"):
             self.cart_service.clear()
-            self._load_cart()
     
     def _checkout(self):
         cart = self.cart_service.get_cart()
@@ -224,15 +271,8 @@ class CartPage:
             messagebox.showwarning("Aviso", "Seu carrinho está vazio.")
             return
         
-        stores = self.cart_service.get_stores_in_cart()
-        if len(stores) > 1:
-            messagebox.showwarning("Aviso", "Por favor, finalize pedidos de uma loja por vez.")
-            return
-        
-        store_id = list(stores.keys())[0]
         if self.dashboard_ref:
-            PaymentWindow(self.dashboard_ref.window, self.user_data, store_id, self.cart_service, self.dashboard_ref)
+            PaymentWindow(self.dashboard_ref.window, self.user_data, self.cart_service, self.dashboard_ref)
         else:
-            PaymentWindow(self.parent.winfo_toplevel(), self.user_data, store_id, self.cart_service, self.dashboard_ref)
-
+            PaymentWindow(self.parent.winfo_toplevel(), self.user_data, self.cart_service, self.dashboard_ref)
 
@@ -1,4 +1,5 @@
 import tkinter as tk
+from src.services.query_executor import get_query_executor
 from src.client.home import HomePage
 from src.client.orders import OrdersPage
 from src.client.stores import StoresPage
@@ -96,6 +97,8 @@ class ClientDashboard:
         }
     
     def _clear_content(self):
+        # Cancela consultas da página anterior que ainda não terminaram
+        get_query_executor().cancel(self.content_frame)
         if self.current_page:
             try:
                 if hasattr(self.current_page, 'window') and self.current_page.window.winfo_exists():
@@ -143,6 +146,7 @@ class ClientDashboard:
         self.current_page = CartPage(self.content_frame, self.user_data, self)
     
     def _on_close(self):
+        get_query_executor().cancel(self.content_frame)
         self.window.destroy()
         if self.parent.winfo_exists():
             from src.auth.login import LoginWindow
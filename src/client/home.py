@@ -1,8 +1,14 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import sqlite3
-from src.services.database import get_db
-from src.services.cart_service import CartService
+from tkinter import messagebox
+from src.services.query_executor import get_query_executor
+from src.services.cart_service import get_cart_service
+from src.services.catalog_cache import get_catalog_cache
+from src.services.search_service import search_catalog, filter_catalog, can_refine
+from src.services.config import get_setting
+from src.services.image_service import thumbnail_key
+from src.services.image_loader import get_image_loader, bind_thumbnail
+from src.components.virtual_list import VirtualList
+from src.utils.helpers import estimate_text_lines
 
 
 class HomePage:
@@ -11,7 +17,13 @@ class HomePage:
         self.parent = parent
         self.user_data = user_data
         self.dashboard_ref = dashboard_ref
-        self.cart_service = CartService()
+        self.cart_service = get_cart_service(self.user_data['id'])
+        
+        self.search_delay = get_setting("search_debounce_ms")
+        self.thumb_size = get_setting("thumbnail_size")
+        self._search_job = None
+        self._current_term = ""
+        self._last_result = None
         
         self._create_widgets()
         self._load_stores_and_products()
@@ -57,277 +69,219 @@ class HomePage:
         )
         clear_btn.pack(side="left", padx=5)
         
-        main_frame = tk.Frame(self.parent)
-        main_frame.pack(fill="both", expand=True, padx=20, pady=10)
-        
-        canvas = tk.Canvas(main_frame, bg="white")
-        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg="white")
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        self.products_list = VirtualList(
+            self.parent,
+            create_row=self._create_row,
+            bind_row=self._bind_row,
+            row_height=self._row_height,
+            row_kind=lambda item: item[0],
+            on_visible_change=self._on_visible_change
         )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        self.products_frame = scrollable_frame
+        self.products_list.pack(fill="both", expand=True, padx=20, pady=10)
+    
+    def _show_loading(self):
+        self.products_list.set_items([])
+        self.products_list.show_message("Carregando...")
     
     def _load_stores_and_products(self):
-        for widget in self.products_frame.winfo_children():
-            widget.destroy()
-        
-        db = get_db()
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                SELECT s.id as store_id, s.name as store_name, s.description as store_description,
-                       p.id as product_id, p.name as product_name, p.description as product_description,
-                       p.price, p.image_path as product_image
-                FROM stores s
-                LEFT JOIN products p ON s.id = p.store_id AND p.is_available = 1
-                ORDER BY s.name, p.name
-            """)
-            
-            results = cursor.fetchall()
-            
-            current_store = None
-            store_frame = None
-            
-            for row in results:
-                if current_store != row['store_id']:
-                    if store_frame:
-                        tk.Label(store_frame, text="", bg="white", height=1).pack()
-                    
-                    current_store = row['store_id']
-                    
-                    store_frame = tk.Frame(self.products_frame, bg="white", relief="solid", bd=1)
-                    store_frame.pack(fill="x", padx=10, pady=10)
-                    
-                    store_header = tk.Frame(store_frame, bg="#FF9800", height=50)
-                    store_header.pack(fill="x")
-                    store_header.pack_propagate(False)
-                    
-                    store_name_label = tk.Label(
-                        store_header,
-                        text=f"🏪 {row['store_name']}",
-                        font=("Arial", 16, "bold"),
-                        bg="#FF9800",
-                        fg="white"
-                    )
-                    store_name_label.pack(pady=10)
-                    
-                    if row['store_description']:
-                        store_desc_label = tk.Label(
-                            store_frame,
-                            text=row['store_description'],
-                            font=("Arial", 10),
-                            bg="white",
-                            wraplength=800,
-                            justify="left"
-                        )
-                        store_desc_label.pack(pady=5, padx=10, anchor="w")
-                    
-                    products_container = tk.Frame(store_frame, bg="white")
-                    products_container.pack(fill="x", padx=10, pady=10)
-                
-                if row['product_id']:
-                    product_frame = tk.Frame(products_container, bg="#f5f5f5", relief="solid", bd=1)
-                    product_frame.pack(fill="x", pady=5, padx=5)
-                    
-                    product_info = tk.Frame(product_frame, bg="#f5f5f5")
-                    product_info.pack(fill="x", padx=10, pady=10)
-                    
-                    product_name_label = tk.Label(
-                        product_info,
-                        text=row['product_name'],
-                        font=("Arial", 12, "bold"),
-                        bg="#f5f5f5",
-                        anchor="w"
-                    )
-                    product_name_label.pack(fill="x")
-                    
-                    if row['product_description']:
-                        product_desc_label = tk.Label(
-                            product_info,
-                            text=row['product_description'],
-                            font=("Arial", 9),
-                            bg="#f5f5f5",
-                            anchor="w",
-                            wraplength=600
-                        )
-                        product_desc_label.pack(fill="x", pady=2)
-                    
-                    price_frame = tk.Frame(product_info, bg="#f5f5f5")
-                    price_frame.pack(fill="x", pady=5)
-                    
-                    price_label = tk.Label(
-                        price_frame,
-                        text=f"R$ {row['price']:.2f}",
-                        font=("Arial", 14, "bold"),
-                        bg="#f5f5f5",
-                        fg="#4CAF50"
-                    )
-                    price_label.pack(side="left")
-                    
-                    add_btn = tk.Button(
-                        price_frame,
-                        text="➕ Adicionar",
-                        font=("Arial", 10),
-                        bg="#4CAF50",
-                        fg="white",
-                        command=lambda pid=row['product_id'], pname=row['product_name'], pprice=row['price'], sid=row['store_id'], sname=row['store_name']: self._add_to_cart(pid, pname, pprice, sid, sname)
-                    )
-                    add_btn.pack(side="right", padx=5)
-            
-            if not results:
-                no_data_label = tk.Label(
-                    self.products_frame,
-                    text="Nenhuma loja ou produto encontrado.",
-                    font=("Arial", 14),
-                    bg="white"
-                )
-                no_data_label.pack(pady=50)
+        # Catálogo já em memória: a troca de aba não consulta o banco
+        rows = get_catalog_cache().peek()
+        if rows is not None:
+            get_query_executor().cancel(self.parent, "home.catalog")
+            self._render_results(rows, "Nenhuma loja ou produto encontrado.")
+            return
         
-        except sqlite3.Error as e:
-            messagebox.showerror("Erro", f"Erro ao carregar dados: {str(e)}")
+        self._show_loading()
+        get_query_executor().submit(
+            self.parent,
+            "home.catalog",
+            get_catalog_cache().rows,
+            lambda results: self._render_results(results, "Nenhuma loja ou produto encontrado."),
+            lambda e: messagebox.showerror("Erro", f"Erro ao carregar dados: {str(e)}")
+        )
     
     def _on_search(self, event=None):
+        # Debounce: só busca quando o usuário para de digitar
+        if self._search_job is not None:
+            self.search_entry.after_cancel(self._search_job)
+        self._search_job = self.search_entry.after(self.search_delay, self._run_search)
+    
+    def _run_search(self):
+        self._search_job = None
+        if not self.search_entry.winfo_exists():
+            return
+        
         search_term = self.search_entry.get().strip().lower()
+        if search_term == self._current_term:
+            return
+        self._current_term = search_term
         
         if not search_term:
+            self._last_result = None
             self._load_stores_and_products()
             return
         
-        for widget in self.products_frame.winfo_children():
-            widget.destroy()
+        # Termo que só estende o anterior: filtra o resultado em memória
+        if can_refine(self._last_result, search_term):
+            get_query_executor().cancel(self.parent, "home.catalog")
+            self._show_search_result(filter_catalog(self._last_result, search_term))
+            return
         
-        db = get_db()
-        conn = db.get_connection()
-        cursor = conn.cursor()
+        get_query_executor().submit(
+            self.parent,
+            "home.catalog",
+            lambda conn: search_catalog(conn, search_term),
+            self._show_search_result,
+            lambda e: messagebox.showerror("Erro", f"Erro ao buscar: {str(e)}")
+        )
+    
+    def _show_search_result(self, result):
+        if result.term != self._current_term:
+            return
+        self._last_result = result
+        self._render_results(result.rows, "Nenhum resultado encontrado.")
+    
+    def _render_results(self, results, empty_text):
+        items = []
+        current_store = None
         
-        try:
-            cursor.execute("""
-                SELECT s.id as store_id, s.name as store_name, s.description as store_description,
-                       p.id as product_id, p.name as product_name, p.description as product_description,
-                       p.price, p.image_path as product_image
-                FROM stores s
-                LEFT JOIN products p ON s.id = p.store_id AND p.is_available = 1
-                WHERE s.name LIKE ? OR p.name LIKE ?
-                ORDER BY s.name, p.name
-            """, (f"%{search_term}%", f"%{search_term}%"))
-            
-            results = cursor.fetchall()
-            
-            current_store = None
-            store_frame = None
+        for row in results:
+            if current_store != row['store_id']:
+                current_store = row['store_id']
+                items.append(("store", row))
+            if row['product_id']:
+                items.append(("product", row))
+        
+        self.products_list.set_items(items)
+        if not results:
+            self.products_list.show_message(empty_text)
+    
+    def _row_height(self, item):
+        kind, row = item
+        if kind == "store":
+            return 70 + 20 * estimate_text_lines(row['store_description'], 110)
+        height = 100 + 16 * estimate_text_lines(row['product_description'], 95)
+        if row['product_image']:
+            height = max(height, self.thumb_size + 32)
+        return height
+    
+    def _on_visible_change(self, visible):
+        items = self.products_list.items
+        get_image_loader().prioritize({
+            thumbnail_key(items[i][1]['product_image'], self.thumb_size)
+            for i in visible
+            if items[i][0] == "product" and items[i][1]['product_image']
+        })
+    
+    def _create_row(self, parent, kind):
+        row = tk.Frame(parent, bg="white")
+        
+        if kind == "store":
+            store_header = tk.Frame(row, bg="#FF9800", height=50)
+            store_header.pack(fill="x", padx=10, pady=(10, 0))
+            store_header.pack_propagate(False)
             
-            for row in results:
-                if current_store != row['store_id']:
-                    if store_frame:
-                        tk.Label(store_frame, text="", bg="white", height=1).pack()
-                    
-                    current_store = row['store_id']
-                    
-                    store_frame = tk.Frame(self.products_frame, bg="white", relief="solid", bd=1)
-                    store_frame.pack(fill="x", padx=10, pady=10)
-                    
-                    store_header = tk.Frame(store_frame, bg="#FF9800", height=50)
-                    store_header.pack(fill="x")
-                    store_header.pack_propagate(False)
-                    
-                    store_name_label = tk.Label(
-                        store_header,
-                        text=f"🏪 {row['store_name']}",
-                        font=("Arial", 16, "bold"),
-                        bg="#FF9800",
-                        fg="white"
-                    )
-                    store_name_label.pack(pady=10)
-                    
-                    if row['store_description']:
-                        store_desc_label = tk.Label(
-                            store_frame,
-                            text=row['store_description'],
-                            font=("Arial", 10),
-                            bg="white",
-                            wraplength=800,
-                            justify="left"
-                        )
-                        store_desc_label.pack(pady=5, padx=10, anchor="w")
-                    
-                    products_container = tk.Frame(store_frame, bg="white")
-                    products_container.pack(fill="x", padx=10, pady=10)
-                
-                if row['product_id']:
-                    product_frame = tk.Frame(products_container, bg="#f5f5f5", relief="solid", bd=1)
-                    product_frame.pack(fill="x", pady=5, padx=5)
-                    
-                    product_info = tk.Frame(product_frame, bg="#f5f5f5")
-                    product_info.pack(fill="x", padx=10, pady=10)
-                    
-                    product_name_label = tk.Label(
-                        product_info,
-                        text=row['product_name'],
-                        font=("Arial", 12, "bold"),
-                        bg="#f5f5f5",
-                        anchor="w"
-                    )
-                    product_name_label.pack(fill="x")
-                    
-                    if row['product_description']:
-                        product_desc_label = tk.Label(
-                            product_info,
-                            text=row['product_description'],
-                            font=("Arial", 9),
-                            bg="#f5f5f5",
-                            anchor="w",
-                            wraplength=600
-                        )
-                        product_desc_label.pack(fill="x", pady=2)
-                    
-                    price_frame = tk.Frame(product_info, bg="#f5f5f5")
-                    price_frame.pack(fill="x", pady=5)
-                    
-                    price_label = tk.Label(
-                        price_frame,
-                        text=f"R$ {row['price']:.2f}",
-                        font=("Arial", 14, "bold"),
-                        bg="#f5f5f5",
-                        fg="#4CAF50"
-                    )
-                    price_label.pack(side="left")
-                    
-                    add_btn = tk.Button(
-                        price_frame,
-                        text="➕ Adicionar",
-                        font=("Arial", 10),
-                        bg="#4CAF50",
-                        fg="white",
-                        command=lambda pid=row['product_id'], pname=row['product_name'], pprice=row['price'], sid=row['store_id'], sname=row['store_name']: self._add_to_cart(pid, pname, pprice, sid, sname)
-                    )
-                    add_btn.pack(side="right", padx=5)
+            row.name_label = tk.Label(
+                store_header,
+                font=("Arial", 16, "bold"),
+                bg="#FF9800",
+                fg="white"
+            )
+            row.name_label.pack(pady=10)
             
-            if not results:
-                no_data_label = tk.Label(
-                    self.products_frame,
-                    text="Nenhum resultado encontrado.",
-                    font=("Arial", 14),
-                    bg="white"
-                )
-                no_data_label.pack(pady=50)
+            row.desc_label = tk.Label(
+                row,
+                font=("Arial", 10),
+                bg="white",
+                wraplength=800,
+                justify="left"
+            )
+            return row
+        
+        product_frame = tk.Frame(row, bg="#f5f5f5", relief="solid", bd=1)
+        product_frame.pack(fill="both", expand=True, pady=5, padx=(25, 15))
+        
+        row.image_label = tk.Label(product_frame, bg="#f5f5f5")
+        
+        row.product_info = tk.Frame(product_frame, bg="#f5f5f5")
+        row.product_info.pack(side="left", fill="both", expand=True, padx=10, pady=10)
+        
+        row.name_label = tk.Label(
+            row.product_info,
+            font=("Arial", 12, "bold"),
+            bg="#f5f5f5",
+            anchor="w"
+        )
+        row.name_label.pack(fill="x")
+        
+        row.desc_label = tk.Label(
+            row.product_info,
+            font=("Arial", 9),
+            bg="#f5f5f5",
+            anchor="w",
+            justify="left",
+            wraplength=600
+        )
+        
+        row.price_frame = tk.Frame(row.product_info, bg="#f5f5f5")
+        row.price_frame.pack(fill="x", pady=5)
         
-        except sqlite3.Error as e:
-            messagebox.showerror("Erro", f"Erro ao buscar: {str(e)}")
+        row.price_label = tk.Label(
+            row.price_frame,
+            font=("Arial", 14, "bold"),
+            bg="#f5f5f5",
+            fg="#4CAF50"
+        )
+        row.price_label.pack(side="left")
+        
+        row.add_btn = tk.Button(
+            row.price_frame,
+            text="➕ Adicionar",
+            font=("Arial", 10),
+            bg="#4CAF50",
+            fg="white"
+        )
+        row.add_btn.pack(side="right", padx=5)
+        return row
+    
+    def _bind_row(self, row, item):
+        kind, data = item
+        
+        if kind == "store":
+            row.name_label.config(text=f"🏪 {data['store_name']}")
+            if data['store_description']:
+                row.desc_label.config(text=data['store_description'])
+                row.desc_label.pack(pady=5, padx=20, anchor="w")
+            else:
+                row.desc_label.pack_forget()
+            return
+        
+        if data['product_image']:
+            bind_thumbnail(row.image_label, data['product_image'], self.thumb_size)
+            row.image_label.pack(side="left", padx=(10, 0), pady=10, before=row.product_info)
+        else:
+            row.image_label.image_key = None
+            row.image_label.pack_forget()
+        
+        row.name_label.config(text=data['product_name'])
+        if data['product_description']:
+            row.desc_label.config(text=data['product_description'])
+            row.desc_label.pack(fill="x", pady=2, after=row.name_label)
+        else:
+            row.desc_label.pack_forget()
+        
+        row.price_label.config(text=f"R$ {data['price']:.2f}")
+        row.add_btn.config(
+            command=lambda pid=data['product_id'], pname=data['product_name'], pprice=data['price'], sid=data['store_id'], sname=data['store_name']: self._add_to_cart(pid, pname, pprice, sid, sname)
+        )
     
     def _clear_search(self):
+        if self._search_job is not None:
+            self.search_entry.after_cancel(self._search_job)
+            self._search_job = None
         self.search_entry.delete(0, tk.END)
+        self._current_term = ""
+        self._last_result = None
         self._load_stores_and_products()
     
     def _add_to_cart(self, product_id, product_name, price, store_id, store_name):
@@ -1,8 +1,11 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import sqlite3
+from tkinter import messagebox
 from datetime import datetime
-from src.services.database import get_db
+from src.services.query_executor import get_query_executor
+from src.services.order_service import get_order_service, ACTIVE_STATUSES
+from src.services.event_bus import get_event_bus, ORDER_STATUS
+from src.services.log import logger
+from src.components.virtual_list import VirtualList
 
 
 class OrdersPage:
@@ -11,7 +14,19 @@ class OrdersPage:
         self.parent = parent
         self.user_data = user_data
         
+        self.last_key = None
+        self.has_more = False
+        self.loading_more = False
+        
+        # Acompanhamento: pedidos exibidos que ainda não são finais e maior
+        # updated_at visto
+        self.active_ids = set()
+        self.tracking_since = None
+        self.tracking_pending = False
+        
         self._create_widgets()
+        self.orders_list.frame.bind("<Destroy>", self._on_destroy)
+        get_event_bus().subscribe(ORDER_STATUS, self._on_status_event)
         self._load_orders()
     
     def _create_widgets(self):
@@ -28,158 +43,226 @@ class OrdersPage:
         )
         title_label.pack(pady=25)
         
-        main_frame = tk.Frame(self.parent)
-        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
-        
-        canvas = tk.Canvas(main_frame, bg="white")
-        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg="white")
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        self.orders_list = VirtualList(
+            self.parent,
+            create_row=self._create_order_row,
+            bind_row=self._bind_order_row,
+            row_height=self._order_row_height,
+            item_key=lambda entry: entry[0].id,
+            on_reach_end=self._load_more_orders
         )
+        self.orders_list.pack(fill="both", expand=True, padx=20, pady=20)
+    
+    def _load_orders(self):
+        self.last_key = None
+        self.has_more = False
+        self.loading_more = False
         
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        self.active_ids = set()
+        self.tracking_since = None
+        self.tracking_pending = False
         
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.orders_list.set_items([])
+        self.orders_list.show_message("Carregando...")
         
-        self.orders_frame = scrollable_frame
+        get_query_executor().submit(
+            self.parent,
+            "client.orders",
+            lambda conn: get_order_service().list_by_client(conn, self.user_data['id']),
+            lambda page: self._render_orders(page, replace=True),
+            lambda e: messagebox.showerror("Erro", f"Erro ao carregar pedidos: {str(e)}")
+        )
     
-    def _load_orders(self):
-        for widget in self.orders_frame.winfo_children():
-            widget.destroy()
+    def _load_more_orders(self):
+        if not self.has_more or self.loading_more:
+            return
         
-        db = get_db()
-        conn = db.get_connection()
-        cursor = conn.cursor()
+        self.loading_more = True
+        after = self.last_key
+        get_query_executor().submit(
+            self.parent,
+            "client.orders",
+            lambda conn: get_order_service().list_by_client(conn, self.user_data['id'], after),
+            lambda page: self._render_orders(page, replace=False),
+            self._on_load_more_error
+        )
+    
+    def _on_load_more_error(self, error):
+        self.loading_more = False
+        messagebox.showerror("Erro", f"Erro ao carregar pedidos: {str(error)}")
+    
+    def _render_orders(self, page, replace):
+        self.loading_more = False
+        self.has_more = page.has_more
+        self.last_key = page.next_key
         
-        try:
-            cursor.execute("""
-                SELECT o.id, o.total_amount, o.status, o.created_at, o.updated_at,
-                       s.name as store_name, s.id as store_id
-                FROM orders o
-                INNER JOIN stores s ON o.store_id = s.id
-                WHERE o.client_id = ?
-                ORDER BY o.created_at DESC
-            """, (self.user_data['id'],))
-            
-            orders = cursor.fetchall()
+        if replace:
+            self.orders_list.set_items(page.entries)
+            if not page.entries:
+                self.orders_list.show_message("Você ainda não realizou nenhum pedido.")
+        else:
+            self.orders_list.append_items(page.entries)
+        
+        for order, items in page.entries:
+            if order.status in ACTIVE_STATUSES:
+                self.active_ids.add(order.id)
+            if self.tracking_since is None or order.updated_at > self.tracking_since:
+                self.tracking_since = order.updated_at
+        
+        if replace and self.tracking_pending and self.active_ids:
+            self.tracking_pending = False
+            self._fetch_status_changes()
+    
+    # Acompanhamento dos pedidos em andamento. Mudanças de status chegam pelo
+    # barramento de eventos; a consulta traz apenas os pedidos com updated_at
+    # a partir da marca d'água e só os cards alterados são redesenhados. Sem
+    # pedidos em andamento na lista, os eventos são ignorados.
+    
+    def _on_status_event(self, event):
+        if event.client_id != self.user_data['id']:
+            return
+        if self.tracking_since is None:
+            # Primeira página ainda carregando
+            self.tracking_pending = True
+            return
+        if event.entity_id in self.active_ids:
+            self._fetch_status_changes()
+    
+    def _fetch_status_changes(self):
+        client_id = self.user_data['id']
+        since = self.tracking_since
+        get_query_executor().submit(
+            self.orders_list.frame,
+            "client.orders.tracking",
+            lambda conn: get_order_service().list_changes_by_client(conn, client_id, since),
+            self._on_status_changes,
+            lambda e: logger.error("Erro ao acompanhar pedidos", exc_info=e)
+        )
+    
+    def _on_status_changes(self, changes):
+        for change in changes:
+            if change.updated_at > self.tracking_since:
+                self.tracking_since = change.updated_at
             
-            if not orders:
-                no_orders_label = tk.Label(
-                    self.orders_frame,
-                    text="Você ainda não realizou nenhum pedido.",
-                    font=("Arial", 14),
-                    bg="white",
-                    fg="#757575"
-                )
-                no_orders_label.pack(pady=50)
-                return
+            index = self.orders_list.index_of(change.id)
+            if index is None:
+                continue
+            order, items = self.orders_list.items[index]
+            if order.status == change.status and order.updated_at == change.updated_at:
+                continue
             
-            for order in orders:
-                order_frame = tk.Frame(self.orders_frame, bg="white", relief="solid", bd=2)
-                order_frame.pack(fill="x", padx=10, pady=10)
-                
-                header_order = tk.Frame(order_frame, bg="#FF9800", height=50)
-                header_order.pack(fill="x")
-                header_order.pack_propagate(False)
-                
-                order_info_top = tk.Frame(header_order, bg="#FF9800")
-                order_info_top.pack(fill="x", padx=15, pady=5)
-                
-                store_label = tk.Label(
-                    order_info_top,
-                    text=f"🏪 {order['store_name']}",
-                    font=("Arial", 16, "bold"),
-                    bg="#FF9800",
-                    fg="white"
-                )
-                store_label.pack(side="left")
-                
-                status_color = self._get_status_color(order['status'])
-                status_label = tk.Label(
-                    order_info_top,
-                    text=order['status'],
-                    font=("Arial", 12, "bold"),
-                    bg=status_color,
-                    fg="white",
-                    padx=10,
-                    pady=5
-                )
-                status_label.pack(side="right", padx=5)
-                
-                order_id_label = tk.Label(
-                    header_order,
-                    text=f"Pedido #{order['id']}",
-                    font=("Arial", 10),
-                    bg="#FF9800",
-                    fg="white"
-                )
-                order_id_label.pack(pady=2)
-                
-                content_order = tk.Frame(order_frame, bg="white")
-                content_order.pack(fill="x", padx=15, pady=10)
-                
-                cursor.execute("""
-                    SELECT oi.quantity, oi.price, p.name as product_name
-                    FROM order_items oi
-                    INNER JOIN products p ON oi.product_id = p.id
-                    WHERE oi.order_id = ?
-                """, (order['id'],))
-                
-                items = cursor.fetchall()
-                
-                items_label = tk.Label(
-                    content_order,
-                    text="Itens:",
-                    font=("Arial", 12, "bold"),
-                    bg="white",
-                    anchor="w"
-                )
-                items_label.pack(fill="x", pady=(0, 5))
-                
-                for item in items:
-                    item_text = f"  • {item['product_name']} x{item['quantity']} = R$ {item['price'] * item['quantity']:.2f}"
-                    item_label = tk.Label(
-                        content_order,
-                        text=item_text,
-                        font=("Arial", 10),
-                        bg="white",
-                        anchor="w",
-                        fg="#424242"
-                    )
-                    item_label.pack(fill="x", padx=10)
-                
-                separator = tk.Frame(content_order, bg="#e0e0e0", height=1)
-                separator.pack(fill="x", pady=10)
-                
-                bottom_info = tk.Frame(content_order, bg="white")
-                bottom_info.pack(fill="x")
-                
-                date_str = self._format_date(order['created_at'])
-                date_label = tk.Label(
-                    bottom_info,
-                    text=f"📅 {date_str}",
-                    font=("Arial", 10),
-                    bg="white",
-                    fg="#757575"
-                )
-                date_label.pack(side="left")
-                
-                total_label = tk.Label(
-                    bottom_info,
-                    text=f"Total: R$ {order['total_amount']:.2f}",
-                    font=("Arial", 14, "bold"),
-                    bg="white",
-                    fg="#4CAF50"
-                )
-                total_label.pack(side="right")
-        
-        except sqlite3.Error as e:
-            messagebox.showerror("Erro", f"Erro ao carregar pedidos: {str(e)}")
+            self.orders_list.update_item(
+                index,
+                (order._replace(status=change.status, updated_at=change.updated_at), items)
+            )
+            if change.status in ACTIVE_STATUSES:
+                self.active_ids.add(change.id)
+            else:
+                self.active_ids.discard(change.id)
+    
+    def _on_destroy(self, event):
+        if event.widget is self.orders_list.frame:
+            get_event_bus().unsubscribe(ORDER_STATUS, self._on_status_event)
+    
+    def _order_row_height(self, entry):
+        order, items = entry
+        return 190 + 20 * len(items)
+    
+    def _create_order_row(self, parent, kind):
+        row = tk.Frame(parent, bg="white")
+        
+        order_frame = tk.Frame(row, bg="white", relief="solid", bd=2)
+        order_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        header_order = tk.Frame(order_frame, bg="#FF9800", height=50)
+        header_order.pack(fill="x")
+        header_order.pack_propagate(False)
+        
+        order_info_top = tk.Frame(header_order, bg="#FF9800")
+        order_info_top.pack(fill="x", padx=15, pady=5)
+        
+        row.store_label = tk.Label(
+            order_info_top,
+            font=("Arial", 16, "bold"),
+            bg="#FF9800",
+            fg="white"
+        )
+        row.store_label.pack(side="left")
+        
+        row.status_label = tk.Label(
+            order_info_top,
+            font=("Arial", 12, "bold"),
+            fg="white",
+            padx=10,
+            pady=5
+        )
+        row.status_label.pack(side="right", padx=5)
+        
+        row.order_id_label = tk.Label(
+            header_order,
+            font=("Arial", 10),
+            bg="#FF9800",
+            fg="white"
+        )
+        row.order_id_label.pack(pady=2)
+        
+        content_order = tk.Frame(order_frame, bg="white")
+        content_order.pack(fill="x", padx=15, pady=10)
+        
+        items_label = tk.Label(
+            content_order,
+            text="Itens:",
+            font=("Arial", 12, "bold"),
+            bg="white",
+            anchor="w"
+        )
+        items_label.pack(fill="x", pady=(0, 5))
+        
+        row.items_text = tk.Label(
+            content_order,
+            font=("Arial", 10),
+            bg="white",
+            anchor="w",
+            justify="left",
+            fg="#424242"
+        )
+        row.items_text.pack(fill="x", padx=10)
+        
+        separator = tk.Frame(content_order, bg="#e0e0e0", height=1)
+        separator.pack(fill="x", pady=10)
+        
+        bottom_info = tk.Frame(content_order, bg="white")
+        bottom_info.pack(fill="x")
+        
+        row.date_label = tk.Label(
+            bottom_info,
+            font=("Arial", 10),
+            bg="white",
+            fg="#757575"
+        )
+        row.date_label.pack(side="left")
+        
+        row.total_label = tk.Label(
+            bottom_info,
+            font=("Arial", 14, "bold"),
+            bg="white",
+            fg="#4CAF50"
+        )
+        row.total_label.pack(side="right")
+        return row
+    
+    def _bind_order_row(self, row, entry):
+        order, items = entry
+        
+        row.store_label.config(text=f"🏪 {order.store_name}")
+        row.status_label.config(text=order.status, bg=self._get_status_color(order.status))
+        row.order_id_label.config(text=f"Pedido #{order.id}")
+        row.items_text.config(text="\n".join(
+            f"  • {item.product_name} x{item.quantity} = R$ {item.price * item.quantity:.2f}"
+            for item in items
+        ))
+        row.date_label.config(text=f"📅 {self._format_date(order.created_at)}")
+        row.total_label.config(text=f"Total: R$ {order.total_amount:.2f}")
     
     def _get_status_color(self, status):
         colors = {
@@ -1,17 +1,18 @@
 import tkinter as tk
 from tkinter import messagebox
-import sqlite3
-from src.services.database import get_db
-from src.services.cart_service import CartService
+from src.services.query_executor import get_query_executor
+from src.services.order_service import get_order_service
+from src.services.checkout_service import StaleCartError
+from src.services.image_service import decode_resized
+from src.services.image_loader import get_image_loader
 from pathlib import Path
 
 
 class PaymentWindow:
     
-    def __init__(self, parent, user_data, store_id, cart_service, dashboard_ref=None):
+    def __init__(self, parent, user_data, cart_service, dashboard_ref=None):
         self.parent = parent
         self.user_data = user_data
-        self.store_id = store_id
         self.cart_service = cart_service
         self.dashboard_ref = dashboard_ref
         
@@ -100,25 +101,25 @@ class PaymentWindow:
         qr_path = Path(__file__).parent.parent.parent / "assets" / "qrcode_pix.png"
         
         if qr_path.exists():
-            try:
-                from PIL import Image, ImageTk
-                img = Image.open(qr_path)
-                img = img.resize((200, 200), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                qr_label = tk.Label(qr_frame, image=photo, bg="white")
-                qr_label.image = photo
-                qr_label.pack(padx=20, pady=20)
-            except Exception as e:
-                print(f"Erro ao carregar imagem do QR Code: {e}")
-                qr_placeholder = tk.Label(
-                    qr_frame,
-                    text="QR Code PIX\n(Imagem não encontrada)",
-                    font=("Arial", 12),
-                    bg="white",
-                    width=25,
-                    height=10
-                )
-                qr_placeholder.pack(padx=20, pady=20)
+            # Decodificado em segundo plano; o texto é trocado pela imagem quando ela fica pronta
+            qr_label = tk.Label(
+                qr_frame,
+                text="Carregando QR Code...",
+                font=("Arial", 12),
+                bg="white",
+                width=25,
+                height=10
+            )
+            qr_label.pack(padx=20, pady=20)
+            
+            photo = get_image_loader().load(
+                qr_label,
+                ("qr_pix", str(qr_path), 200),
+                lambda: decode_resized(qr_path, (200, 200)),
+                lambda photo: self._show_qr_code(qr_label, photo)
+            )
+            if photo is not None:
+                self._show_qr_code(qr_label, photo)
         else:
             qr_placeholder = tk.Label(
                 qr_frame,
@@ -134,7 +135,7 @@ class PaymentWindow:
         button_frame = tk.Frame(content_frame)
         button_frame.pack(pady=20)
         
-        confirm_btn = tk.Button(
+        self.confirm_btn = tk.Button(
             button_frame,
             text="Confirmar Pagamento",
             font=("Arial", 12, "bold"),
@@ -144,7 +145,7 @@ class PaymentWindow:
             height=2,
             command=self._confirm_payment
         )
-        confirm_btn.pack(side="left", padx=5)
+        self.confirm_btn.pack(side="left", padx=5)
         
         cancel_btn = tk.Button(
             button_frame,
@@ -156,34 +157,42 @@ class PaymentWindow:
         )
         cancel_btn.pack(side="left", padx=5)
     
+    def _show_qr_code(self, qr_label, photo):
+        if photo is None:
+            qr_label.config(text="QR Code PIX\n(Imagem não encontrada)")
+            return
+        qr_label.config(image=photo, text="", width=0, height=0)
+        qr_label.image = photo
+    
     def _load_order_summary(self):
         for widget in self.items_frame.winfo_children():
             widget.destroy()
         
         stores = self.cart_service.get_stores_in_cart()
-        store_data = stores[self.store_id]
-        
-        store_label = tk.Label(
-            self.items_frame,
-            text=f"Loja: {store_data['store_name']}",
-            font=("Arial", 14, "bold"),
-            bg="white"
-        )
-        store_label.pack(pady=5, anchor="w")
         
-        for item in store_data['items']:
-            item_frame = tk.Frame(self.items_frame, bg="white")
-            item_frame.pack(fill="x", pady=2, padx=10)
-            
-            item_text = f"{item['product_name']} x{item['quantity']} = R$ {item['price'] * item['quantity']:.2f}"
-            item_label = tk.Label(
-                item_frame,
-                text=item_text,
-                font=("Arial", 11),
-                bg="white",
-                anchor="w"
+        # Um pedido será criado para cada loja
+        for store_data in stores.values():
+            store_label = tk.Label(
+                self.items_frame,
+                text=f"Loja: {store_data['store_name']}",
+                font=("Arial", 14, "bold"),
+                bg="white"
             )
-            item_label.pack(fill="x")
+            store_label.pack(pady=5, anchor="w")
+            
+            for item in store_data['items']:
+                item_frame = tk.Frame(self.items_frame, bg="white")
+                item_frame.pack(fill="x", pady=2, padx=10)
+                
+                item_text = f"{item['product_name']} x{item['quantity']} = R$ {item['price'] * item['quantity']:.2f}"
+                item_label = tk.Label(
+                    item_frame,
+                    text=item_text,
+                    font=("Arial", 11),
+                    bg="white",
+                    anchor="w"
+                )
+                item_label.pack(fill="x")
     
     def _confirm_payment(self):
         cart = self.cart_service.get_cart()
@@ -191,36 +200,63 @@ class PaymentWindow:
             messagebox.showwarning("Aviso", "Carrinho vazio.")
             return
         
-        db = get_db()
-        conn = db.get_connection()
-        cursor = conn.cursor()
+        # Cópia do carrinho: a gravação roda fora da thread do Tk
+        stores = {
+            store_id: {**store_data, 'items': [dict(item) for item in store_data['items']]}
+            for store_id, store_data in self.cart_service.get_stores_in_cart().items()
+        }
+        client_id = self.user_data['id']
+        product_ids = [item['product_id'] for store_data in stores.values() for item in store_data['items']]
+        cart_service = self.cart_service
         
-        try:
-            total = self.cart_service.get_total()
-            
-            cursor.execute(
-                "INSERT INTO orders (client_id, store_id, total_amount, status) VALUES (?, ?, ?, ?)",
-                (self.user_data['id'], self.store_id, total, 'Pendente')
-            )
-            order_id = cursor.lastrowid
-            
-            for item in cart.values():
-                cursor.execute(
-                    "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)",
-                    (order_id, item['product_id'], item['quantity'], item['price'])
-                )
-            
-            conn.commit()
-            
-            self.cart_service.clear()
+        def place(conn):
+            # Grava alterações pendentes do carrinho antes: um flush atrasado
+            # depois do checkout traria os itens pedidos de volta
+            cart_service.flush()
+            return get_order_service().place(conn, client_id, stores)
+        
+        self.confirm_btn.config(state="disabled", text="Confirmando...")
+        # Sem cancelamento: fechar a janela não interrompe a gravação e os
+        # itens pedidos saem do carrinho mesmo assim
+        get_query_executor().run(
+            self.window,
+            "checkout",
+            place,
+            lambda order_ids: self._on_orders_placed(order_ids, product_ids),
+            self._on_checkout_error,
+            readonly=False
+        )
+    
+    def _on_orders_placed(self, order_ids, product_ids):
+        # Só os produtos pedidos saem: itens adicionados enquanto o pedido
+        # era gravado continuam no carrinho
+        for product_id in product_ids:
+            self.cart_service.remove_item(product_id)
+        if not self.window.winfo_exists():
+            return
+        if len(order_ids) > 1:
+            messagebox.showinfo("Sucesso", f"{len(order_ids)} pedidos confirmados com sucesso!")
+        else:
             messagebox.showinfo("Sucesso", "Pedido confirmado com sucesso!")
-            self.window.destroy()
-            
-            if self.dashboard_ref:
-                self.dashboard_ref._show_orders()
+        self.window.destroy()
         
-        except sqlite3.Error as e:
-            messagebox.showerror("Erro", f"Erro ao confirmar pedido: {str(e)}")
+        if self.dashboard_ref:
+            self.dashboard_ref._show_orders()
+    
+    def _on_checkout_error(self, error):
+        if isinstance(error, StaleCartError):
+            # Carrinho relido com os preços atuais; o resumo desta janela
+            # ficou desatualizado, então ela é fechada para o cliente revisar
+            self.cart_service.revalidate()
+            messagebox.showwarning("Aviso", f"{str(error)}\nRevise o carrinho antes de confirmar.")
+            if self.window.winfo_exists():
+                self.window.destroy()
+            return
+        if not self.window.winfo_exists():
+            messagebox.showerror("Erro", f"Erro ao confirmar pedido: {str(error)}")
+            return
+        self.confirm_btn.config(state="normal", text="Confirmar Pagamento")
+        messagebox.showerror("Erro", f"Erro ao confirmar pedido: {str(error)}")
     
     def _cancel(self):
         self.window.destroy()
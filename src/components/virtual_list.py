@@ -0,0 +1,272 @@
+import tkinter as tk
+from tkinter import ttk
+from bisect import bisect_right
+from collections import defaultdict
+
+
+# Lista rolável que só materializa as linhas visíveis no Canvas. As linhas
+# que saem da área visível voltam para um pool (por tipo) e são reaproveitadas.
+#
+#   create_row(parent, kind) -> widget   cria uma linha vazia do tipo informado
+#   bind_row(widget, item)              preenche a linha com os dados do item
+#   row_height(item) -> int             altura estimada da linha, em pixels; se o
+#                                       conteúdo pedir mais, a linha cresce
+#   row_kind(item) -> str               tipo da linha (padrão: "row")
+#   item_key(item) -> hashable          chave do item, para index_of (opcional)
+class VirtualList:
+
+    def __init__(self, parent, create_row, bind_row, row_height, row_kind=None,
+                 bg="white", overscan=300, on_reach_end=None, on_visible_change=None,
+                 item_key=None):
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.row_height = row_height
+        self.row_kind = row_kind or (lambda item: "row")
+        self.overscan = overscan
+        self.on_reach_end = on_reach_end
+        self.on_visible_change = on_visible_change
+        self.item_key = item_key
+
+        self.frame = tk.Frame(parent)
+        self.canvas = tk.Canvas(self.frame, bg=bg, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.bind("<Configure>", self._on_resize)
+
+        self.items = []
+        self.offsets = [0]
+        self._key_index = None
+        # id(item) -> (item, altura medida) das linhas maiores que a estimativa
+        self._measured = {}
+        self._measure_pending = False
+        self._visible = {}
+        self._pool = defaultdict(list)
+        self._windows = {}
+        self._message_id = None
+        self._render_pending = False
+        self._width = 1
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def destroy(self):
+        self.frame.destroy()
+
+    # Dados
+
+    def set_items(self, items, keep_scroll=False):
+        self._release_all()
+        self.items = list(items)
+        self._measured.clear()
+        self._rebuild_offsets(0)
+        if not keep_scroll:
+            self.canvas.yview_moveto(0)
+        self.show_message(None)
+        self._schedule_render()
+
+    def append_items(self, items):
+        start = len(self.items)
+        self.items.extend(items)
+        self._rebuild_offsets(start)
+        self._schedule_render()
+
+    # Inserir e remover não refazem as linhas visíveis: as de antes do índice
+    # ficam como estão e as de depois só mudam de posição
+    def insert_items(self, index, items):
+        self.items[index:index] = items
+        self._rebuild_offsets(index)
+        self._shift_visible(index, len(items))
+        self._schedule_render()
+
+    def remove_item(self, index):
+        if index in self._visible:
+            self._release(index)
+        self._measured.pop(id(self.items[index]), None)
+        del self.items[index]
+        self._rebuild_offsets(index)
+        self._shift_visible(index + 1, -1)
+        self._schedule_render()
+
+    def update_item(self, index, item):
+        old = self.items[index]
+        self.items[index] = item
+        if self.item_key is not None and self.item_key(old) != self.item_key(item):
+            self._key_index = None
+
+        self._measured.pop(id(old), None)
+
+        if self.row_height(old) != self.row_height(item) or self.row_kind(old) != self.row_kind(item):
+            if index in self._visible:
+                self._release(index)
+            self._rebuild_offsets(index)
+            self._shift_visible(index + 1, 0)
+            self._schedule_render()
+            return
+
+        row = self._visible.get(index)
+        if row is not None:
+            self.bind_row(row, item)
+
+    def refresh(self):
+        self._release_all()
+        self._rebuild_offsets(0)
+        self._schedule_render()
+
+    def index_of(self, key):
+        if self._key_index is None:
+            self._key_index = {self.item_key(item): index for index, item in enumerate(self.items)}
+        return self._key_index.get(key)
+
+    def visible_range(self):
+        if not self._visible:
+            return range(0)
+        return range(min(self._visible), max(self._visible) + 1)
+
+    def show_message(self, text):
+        if self._message_id is not None:
+            self.canvas.delete(self._message_id)
+            self._message_id = None
+        if text:
+            self._message_id = self.canvas.create_text(
+                self._width // 2, 50,
+                text=text,
+                font=("Arial", 14),
+                fill="#757575",
+                justify="center",
+                anchor="n"
+            )
+
+    # Layout
+
+    def _height(self, item):
+        height = self.row_height(item)
+        measured = self._measured.get(id(item))
+        return max(height, measured[1]) if measured else height
+
+    def _rebuild_offsets(self, start):
+        self._key_index = None
+        del self.offsets[start + 1:]
+        total = self.offsets[start]
+        for item in self.items[start:]:
+            total += self._height(item)
+            self.offsets.append(total)
+        self.canvas.configure(scrollregion=(0, 0, self._width, max(total, 1)))
+
+    def _shift_visible(self, start, delta):
+        # Linhas visíveis a partir de start (índices antigos) passam para
+        # index + delta e vão para a nova posição, sem bind_row
+        shifted = {}
+        for index, row in self._visible.items():
+            if index >= start:
+                index += delta
+                self._place(row, index)
+            shifted[index] = row
+        self._visible = shifted
+
+    def _place(self, row, index):
+        self.canvas.coords(self._windows[row], 0, self.offsets[index])
+        self.canvas.itemconfigure(self._windows[row], height=self.offsets[index + 1] - self.offsets[index])
+
+    def _schedule_render(self):
+        if not self._render_pending:
+            self._render_pending = True
+            self.canvas.after_idle(self._render)
+
+    def _render(self):
+        self._render_pending = False
+        if not self.canvas.winfo_exists():
+            return
+
+        top = self.canvas.canvasy(0) - self.overscan
+        bottom = self.canvas.canvasy(0) + self.canvas.winfo_height() + self.overscan
+
+        first = max(bisect_right(self.offsets, top) - 1, 0)
+        wanted = set()
+        index = first
+        while index < len(self.items) and self.offsets[index] < bottom:
+            wanted.add(index)
+            index += 1
+
+        for index in [i for i in self._visible if i not in wanted]:
+            self._release(index)
+
+        for index in sorted(wanted):
+            if index not in self._visible:
+                self._acquire(index)
+
+        if self.on_visible_change:
+            self.on_visible_change(self.visible_range())
+
+        if not self._measure_pending:
+            self._measure_pending = True
+            self.canvas.after_idle(self._measure)
+
+    def _measure(self):
+        # Depois do layout: linhas cujo conteúdo não coube na altura estimada
+        # crescem até a altura pedida, e as seguintes descem
+        self._measure_pending = False
+        if not self.canvas.winfo_exists():
+            return
+
+        first = None
+        for index, row in self._visible.items():
+            needed = row.winfo_reqheight()
+            if needed > self.offsets[index + 1] - self.offsets[index]:
+                item = self.items[index]
+                self._measured[id(item)] = (item, needed)
+                first = index if first is None else min(first, index)
+
+        if first is not None:
+            self._rebuild_offsets(first)
+            self._shift_visible(first, 0)
+            self._schedule_render()
+
+    def _acquire(self, index):
+        item = self.items[index]
+        kind = self.row_kind(item)
+
+        if self._pool[kind]:
+            row = self._pool[kind].pop()
+        else:
+            row = self.create_row(self.canvas, kind)
+            row._virtual_kind = kind
+            self._windows[row] = self.canvas.create_window(0, 0, window=row, anchor="nw")
+
+        self.bind_row(row, item)
+        self._place(row, index)
+        self.canvas.itemconfigure(self._windows[row], width=self._width, state="normal")
+        self._visible[index] = row
+
+    def _release(self, index):
+        row = self._visible.pop(index)
+        self.canvas.itemconfigure(self._windows[row], state="hidden")
+        self._pool[row._virtual_kind].append(row)
+
+    def _release_all(self):
+        for index in list(self._visible):
+            self._release(index)
+
+    # Eventos
+
+    def _on_resize(self, event):
+        if event.width == self._width:
+            self._schedule_render()
+            return
+
+        self._width = event.width
+        for window_id in self._windows.values():
+            self.canvas.itemconfigure(window_id, width=self._width)
+        if self._message_id is not None:
+            self.canvas.coords(self._message_id, self._width // 2, 50)
+        self.canvas.configure(scrollregion=(0, 0, self._width, max(self.offsets[-1], 1)))
+        self._schedule_render()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_render()
+        # Avisa quando o fim da lista fica visível (paginação)
+        if self.on_reach_end and self.items and float(last) >= 0.95:
+            self.on_reach_end()
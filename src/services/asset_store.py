@@ -0,0 +1,213 @@
+import os
+import sys
+import time
+import shutil
+import hashlib
+import sqlite3
+from pathlib import Path
+
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+OBJECTS_DIR = PROJECT_DIR / "assets" / "objects"
+THUMBNAILS_DIR = PROJECT_DIR / "assets" / "thumbnails"
+LEGACY_DIRS = (PROJECT_DIR / "assets" / "products", PROJECT_DIR / "assets" / "stores")
+
+# Arquivos gravados (ou reaproveitados por put) há menos tempo que isso não
+# são coletados: podem estar em um cadastro que ainda não fez commit
+GC_GRACE_SECONDS = 3600
+
+
+# Imagens gravadas pelo hash do conteúdo. A chave guardada no banco é o
+# caminho relativo à raiz do projeto (assets/objects/ab/abcd....jpg), então
+# uploads iguais viram um único arquivo e a instalação pode mudar de pasta.
+# A tabela assets conta as referências (mantida por triggers, ver migrations).
+class AssetStore:
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else PROJECT_DIR
+        self.objects_dir = self.root / OBJECTS_DIR.relative_to(PROJECT_DIR)
+        self.thumbnails_dir = self.root / THUMBNAILS_DIR.relative_to(PROJECT_DIR)
+
+    def _hash_file(self, source):
+        digest = hashlib.sha256()
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def put(self, source):
+        source = Path(source)
+        digest = self._hash_file(source)
+        ext = source.suffix.lower() or ".bin"
+        path = self.objects_dir / digest[:2] / f"{digest}{ext}"
+
+        if path.exists():
+            # Upload repetido: renova a data para o gc respeitar a carência
+            # enquanto a linha que aponta para o arquivo não faz commit
+            os.utime(path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, path)
+
+        return path.relative_to(self.root).as_posix()
+
+    def path(self, key):
+        return self.root / key
+
+    def is_key(self, value):
+        return bool(value) and value.startswith(self.objects_dir.relative_to(self.root).as_posix() + "/")
+
+    def _candidates(self, legacy):
+        dirs = [self.objects_dir]
+        if legacy:
+            dirs.extend(self.root / d.relative_to(PROJECT_DIR) for d in LEGACY_DIRS)
+        for folder in dirs:
+            if not folder.exists():
+                continue
+            for path in folder.rglob("*"):
+                if path.is_file() and path.name != ".gitkeep":
+                    yield path
+
+    def _referenced(self, cursor):
+        cursor.execute("SELECT key FROM assets WHERE refcount > 0")
+        referenced = {row[0] for row in cursor.fetchall()}
+
+        # Caminhos antigos (fora do armazenamento) ainda referenciados
+        for table in ("products", "stores"):
+            cursor.execute(f"SELECT image_path FROM {table} WHERE image_path IS NOT NULL")
+            referenced.update(row[0] for row in cursor.fetchall())
+        return referenced
+
+    def _live_thumbnails(self, referenced):
+        from src.services.image_service import resolve_image_path, thumbnail_base
+
+        bases = set()
+        for key in referenced:
+            source = self.path(key) if self.is_key(key) else resolve_image_path(key)
+            if source is not None and source.exists():
+                bases.add(thumbnail_base(source))
+        return bases
+
+    def _orphan_thumbnails(self, referenced):
+        if not self.thumbnails_dir.exists():
+            return
+        live = self._live_thumbnails(referenced)
+        for path in self.thumbnails_dir.iterdir():
+            if not path.is_file():
+                continue
+            # <base>_<tamanho>.jpg; restos .tmp de gravações interrompidas também saem
+            if path.suffix == ".jpg" and path.stem.rsplit("_", 1)[0] in live:
+                continue
+            yield path
+
+    def collect_garbage(self, conn, dry_run=False, legacy=False, grace=GC_GRACE_SECONDS):
+        cursor = conn.cursor()
+        referenced = self._referenced(cursor)
+        referenced_names = {Path(key.replace("\\", "/")).name for key in referenced}
+        now = time.time()
+        removed = []
+        freed = 0
+
+        def remove(path):
+            nonlocal freed
+            stat = path.stat()
+            if now - stat.st_mtime < grace:
+                return
+            freed += stat.st_size
+            removed.append(path.relative_to(self.root).as_posix())
+            if not dry_run:
+                path.unlink()
+
+        for path in self._candidates(legacy):
+            key = path.relative_to(self.root).as_posix()
+            if key in referenced or path.name in referenced_names:
+                continue
+            remove(path)
+
+        for path in list(self._orphan_thumbnails(referenced)):
+            remove(path)
+
+        if not dry_run:
+            cursor.execute("DELETE FROM assets WHERE refcount <= 0")
+            conn.commit()
+
+        return removed, freed
+
+    def import_legacy(self, conn):
+        # Copia para o armazenamento as imagens ainda gravadas com caminho
+        # antigo (absoluto ou em assets/products, assets/stores); os triggers
+        # de assets ajustam as contagens
+        from src.services.image_service import resolve_image_path
+
+        cursor = conn.cursor()
+        imported = 0
+        for table in ("products", "stores"):
+            cursor.execute(f"SELECT id, image_path FROM {table} WHERE image_path IS NOT NULL")
+            for row_id, image_path in cursor.fetchall():
+                if self.is_key(image_path):
+                    continue
+                source = resolve_image_path(image_path)
+                if source is None:
+                    continue
+                cursor.execute(
+                    f"UPDATE {table} SET image_path = ? WHERE id = ?",
+                    (self.put(source), row_id)
+                )
+                imported += 1
+        conn.commit()
+        return imported
+
+
+_asset_store = None
+
+
+def get_asset_store():
+    global _asset_store
+    if _asset_store is None:
+        _asset_store = AssetStore()
+    return _asset_store
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("gc", "import"):
+        print("Uso: python -m src.services.asset_store gc [--dry-run] [--legacy] [caminho_do_banco]")
+        print("     python -m src.services.asset_store import [caminho_do_banco]")
+        return 2
+
+    from src.services.database import Database
+
+    command = argv[0]
+    args = argv[1:]
+    dry_run = "--dry-run" in args
+    legacy = "--legacy" in args
+    args = [arg for arg in args if arg not in ("--dry-run", "--legacy")]
+
+    db = Database(os.path.abspath(args[0])) if args else Database()
+    try:
+        with db.connection() as conn:
+            if command == "import":
+                imported = get_asset_store().import_legacy(conn)
+            else:
+                removed, freed = get_asset_store().collect_garbage(conn, dry_run=dry_run, legacy=legacy)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Erro ao {'importar' if command == 'import' else 'coletar'} arquivos: {e}")
+        return 1
+    finally:
+        db.close()
+
+    if command == "import":
+        print(f"{imported} imagem(ns) copiada(s) para o armazenamento")
+        return 0
+
+    action = "Seriam removidos" if dry_run else "Removidos"
+    for key in removed:
+        print(f"  {key}")
+    print(f"{action} {len(removed)} arquivo(s), {freed / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
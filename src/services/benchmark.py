@@ -0,0 +1,296 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import platform
+import tempfile
+from src.services.database import Database
+from src.services.catalog_cache import CatalogCache
+from src.services.data_generator import DataGenerator, SCALES
+from src.services.order_service import OrderService, ORDER_STATUSES
+from src.services.search_service import search_catalog, LIKE_SEARCH_SQL
+
+
+SEARCH_TERMS = ["pizza", "calab", "açaí de cupuaçu", "hamburguer duplo", "zzzz"]
+
+
+def _log(message):
+    print(message, file=sys.stderr)
+
+
+def percentile(sorted_values, p):
+    # Posto mais próximo: o menor valor com pelo menos p% das amostras abaixo
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples_ns):
+    values = sorted(ns / 1e6 for ns in samples_ns)
+    return {
+        "n": len(values),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "mean_ms": round(sum(values) / len(values), 3),
+        "min_ms": round(values[0], 3),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+# Mede os caminhos de acesso a dados das telas sem Tk: as mesmas consultas e
+# serviços que HomePage, OrdersPage, StoreOrdersPage e PaymentWindow usam.
+# Cada caso recebe uma função que prepara os argumentos (fora da medição) e
+# outra que executa a operação.
+class Benchmark:
+
+    def __init__(self, db, iterations=50, warmup=3, seed=None):
+        self.db = db
+        self.iterations = iterations
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+        self.orders = OrderService()
+        self.results = {}
+
+    def measure(self, name, run, prepare=None):
+        samples = []
+        for i in range(self.warmup + self.iterations):
+            args = prepare() if prepare else ()
+            started = time.perf_counter_ns()
+            run(*args)
+            elapsed = time.perf_counter_ns() - started
+            if i >= self.warmup:
+                samples.append(elapsed)
+
+        self.results[name] = summarize(samples)
+        _log(f"  {name:<32} p50 {self.results[name]['p50_ms']:>9.3f} ms   p99 {self.results[name]['p99_ms']:>9.3f} ms")
+        return self.results[name]
+
+    def _sample_ids(self, conn):
+        # Clientes e lojas com mais pedidos (o pior caso) e alguns sorteados
+        cursor = conn.cursor()
+        cursor.execute("SELECT client_id FROM orders GROUP BY client_id ORDER BY COUNT(*) DESC LIMIT 1")
+        heavy_client = cursor.fetchone()[0]
+        cursor.execute("SELECT store_id FROM orders GROUP BY store_id ORDER BY COUNT(*) DESC LIMIT 1")
+        heavy_store = cursor.fetchone()[0]
+        cursor.execute("SELECT id FROM users WHERE user_type = 'client'")
+        clients = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT id FROM stores")
+        stores = [row[0] for row in cursor.fetchall()]
+        return heavy_client, heavy_store, clients, stores
+
+    def run_catalog(self, conn):
+        self.measure("home.catalog.cold", lambda: CatalogCache().rows(conn))
+
+        cache = CatalogCache()
+        cache.rows(conn)
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM stores")
+        stores = [row[0] for row in cursor.fetchall()]
+
+        def invalidate():
+            cache.invalidate_store(self.rng.choice(stores))
+            return ()
+
+        self.measure("home.catalog.store_reload", lambda: cache.rows(conn), prepare=invalidate)
+
+    def run_search(self, conn):
+        for term in SEARCH_TERMS:
+            pattern = f"%{term}%"
+            self.measure(
+                f"search.like[{term}]",
+                lambda: conn.execute(LIKE_SEARCH_SQL, (pattern, pattern, 200)).fetchall()
+            )
+            self.measure(f"search.fts[{term}]", lambda: search_catalog(conn, term, limit=200))
+
+    def _measure_pages(self, name, conn, list_orders, owner_id):
+        # Rolagem infinita: cada amostra é a próxima página (pedidos + itens)
+        state = {"after": None}
+
+        def next_page():
+            page = list_orders(conn, owner_id, state["after"])
+            state["after"] = page.next_key if page.has_more else None
+
+        self.measure(name, next_page)
+
+    def run_orders(self, conn, heavy_client, heavy_store, clients, stores):
+        self.measure(
+            "client.orders.first_page",
+            lambda client_id: self.orders.list_by_client(conn, client_id),
+            prepare=lambda: (self.rng.choice(clients),)
+        )
+        self.measure("client.orders.first_page.heavy", lambda: self.orders.list_by_client(conn, heavy_client))
+        self._measure_pages("client.orders.next_pages.heavy", conn, self.orders.list_by_client, heavy_client)
+
+        self.measure(
+            "store.orders.first_page",
+            lambda store_id: self.orders.list_by_store(conn, store_id),
+            prepare=lambda: (self.rng.choice(stores),)
+        )
+        self.measure("store.orders.first_page.heavy", lambda: self.orders.list_by_store(conn, heavy_store))
+        self._measure_pages("store.orders.next_pages.heavy", conn, self.orders.list_by_store, heavy_store)
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM orders WHERE store_id = ?", (heavy_store,))
+        last_id = cursor.fetchone()[0]
+        self.measure("store.orders.feed", lambda: self.orders.list_new_by_store(conn, heavy_store, last_id - 5))
+
+        cursor.execute("SELECT COALESCE(MAX(updated_at), '') FROM orders WHERE client_id = ?", (heavy_client,))
+        since = cursor.fetchone()[0]
+        self.measure("client.orders.tracking", lambda: self.orders.list_changes_by_client(conn, heavy_client, since))
+
+    def run_checkout(self, clients):
+        # Mesmo caminho de PaymentWindow._confirm_payment: um pedido por loja
+        # do carrinho, numa transação, em uma conexão de escrita do pool
+        with self.db.connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, store_id, price FROM products WHERE is_available = 1")
+            menus = {}
+            for product_id, store_id, price in cursor.fetchall():
+                menus.setdefault(store_id, []).append((product_id, price))
+        store_ids = list(menus)
+
+        def cart():
+            carts = {}
+            for store_id in self.rng.sample(store_ids, min(len(store_ids), self.rng.choice((1, 1, 1, 2)))):
+                products = self.rng.sample(menus[store_id], min(len(menus[store_id]), self.rng.randint(1, 4)))
+                carts[store_id] = {'items': [
+                    {'product_id': product_id, 'price': price, 'quantity': self.rng.randint(1, 3)}
+                    for product_id, price in products
+                ]}
+            return self.rng.choice(clients), carts
+
+        def place(client_id, carts):
+            with self.db.connection() as conn:
+                self.orders.place(conn, client_id, carts)
+
+        self.measure("checkout.place_orders", place, prepare=cart)
+
+    def run_update_status(self, heavy_store):
+        # Mesmo caminho de StoreOrdersPage._update_status
+        with self.db.connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id FROM orders WHERE store_id = ? ORDER BY id DESC LIMIT 500",
+                (heavy_store,)
+            )
+            order_ids = [row[0] for row in cursor.fetchall()]
+
+        def pick():
+            return self.rng.choice(order_ids), self.rng.choice(ORDER_STATUSES)
+
+        def update(order_id, status):
+            with self.db.connection() as conn:
+                self.orders.update_status(conn, heavy_store, order_id, status)
+
+        self.measure("store.update_status", update, prepare=pick)
+
+    def run(self):
+        with self.db.connection(readonly=True) as conn:
+            heavy_client, heavy_store, clients, stores = self._sample_ids(conn)
+            self.run_catalog(conn)
+            self.run_search(conn)
+            self.run_orders(conn, heavy_client, heavy_store, clients, stores)
+        self.run_checkout(clients)
+        self.run_update_status(heavy_store)
+        return self.results
+
+
+def _dataset_counts(db):
+    with db.connection(readonly=True) as conn:
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("stores", "products", "users", "orders", "order_items")
+        }
+
+
+def _remove_database(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def prepare_dataset(data_dir, scale, seed, regenerate=False):
+    # O banco gerado é guardado e reaproveitado; cada execução usa uma cópia,
+    # porque os casos de escrita (checkout, status) alteram os dados
+    path = os.path.join(data_dir, f"bench_{scale}_{seed}.db")
+    if regenerate or not os.path.exists(path):
+        _remove_database(path)
+        _log(f"Gerando dados ({scale})...")
+        db = Database(path)
+        try:
+            with db.connection() as conn:
+                conn.execute("PRAGMA synchronous = OFF")
+                DataGenerator(conn, seed=seed, log=_log).generate(*SCALES[scale])
+        finally:
+            db.close()
+
+    run_path = os.path.join(data_dir, f"bench_{scale}_{seed}.run.db")
+    _remove_database(run_path)
+    shutil.copyfile(path, run_path)
+    return run_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.services.benchmark",
+        description="Mede as consultas principais em bancos sintéticos e grava p50/p95/p99 em JSON."
+    )
+    parser.add_argument("--scales", default="small", help="escalas separadas por vírgula: " + ", ".join(sorted(SCALES)))
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "urbanfood-bench"))
+    parser.add_argument("--regenerate", action="store_true", help="gera os dados de novo mesmo se já existirem")
+    parser.add_argument("--output", help="arquivo JSON de saída (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"escala desconhecida: {', '.join(unknown)}")
+
+    args.data_dir = os.path.abspath(args.data_dir)
+    os.makedirs(args.data_dir, exist_ok=True)
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "seed": args.seed,
+        "scales": {},
+    }
+
+    for scale in scales:
+        path = prepare_dataset(args.data_dir, scale, args.seed, args.regenerate)
+        db = Database(path)
+        try:
+            _log(f"Escala {scale}:")
+            dataset = _dataset_counts(db)
+            results = Benchmark(db, args.iterations, args.warmup, args.seed).run()
+        except sqlite3.Error as e:
+            _log(f"Erro no benchmark ({scale}): {e}")
+            return 1
+        finally:
+            db.close()
+            _remove_database(path)
+        report["scales"][scale] = {"dataset": dataset, "results": results}
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,64 +1,280 @@
+import atexit
+import sqlite3
+import threading
+from types import MappingProxyType
+from collections import namedtuple
+from src.services.database import get_db
+from src.services.config import get_setting
+from src.services.log import logger
+
+
+def _cents(price):
+    return int(round(price * 100))
+
+
+# kind: "added", "updated", "removed" ou "cleared" (sem produto)
+CartEvent = namedtuple("CartEvent", ["kind", "product_id", "store_id", "item"])
+
+
+# Carrinho de um usuário, salvo na tabela cart_items. As alterações ficam em
+# memória e são gravadas em lote (uma transação) cart_flush_ms depois da
+# primeira alteração pendente, em vez de um commit por clique. Total,
+# quantidade e o agrupamento por loja são mantidos a cada alteração (O(1)),
+# e as leituras devolvem visões somente leitura em vez de cópias.
 class CartService:
-    _instance = None
-    _cart = {}
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(CartService, cls).__new__(cls)
-        return cls._instance
-    
-    def add_item(self, product_id, product_name, price, store_id, store_name, quantity=1):
-        if product_id not in self._cart:
-            self._cart[product_id] = {
-                'product_id': product_id,
-                'product_name': product_name,
-                'price': price,
-                'store_id': store_id,
-                'store_name': store_name,
-                'quantity': 0
+
+    def __init__(self, user_id, flush_delay=None):
+        self.user_id = user_id
+        self.flush_delay = (flush_delay if flush_delay is not None else get_setting("cart_flush_ms")) / 1000
+
+        self._lock = threading.RLock()
+        # _items guarda os dicionários; _cart e _store_views são as visões
+        # expostas (MappingProxyType), que acompanham as alterações
+        self._items = {}
+        self._cart = {}
+        self._stores = {}
+        self._store_views = {}
+        self._cart_view = MappingProxyType(self._cart)
+        self._stores_view = MappingProxyType(self._store_views)
+        self._dirty = set()
+        self._listeners = []
+        self._timer = None
+        self._total_cents = 0
+        self._items_count = 0
+
+        self._load()
+
+    def _load(self):
+        # Nome e preço vêm do cardápio atual, não da cópia salva no carrinho;
+        # produtos removidos ou indisponíveis saem do carrinho
+        with get_db().connection(readonly=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT c.product_id, c.product_name, c.price, c.quantity,
+                       p.name AS current_name, p.price AS current_price, p.is_available,
+                       p.store_id, s.name AS store_name
+                FROM cart_items c
+                LEFT JOIN products p ON p.id = c.product_id
+                LEFT JOIN stores s ON s.id = p.store_id
+                WHERE c.user_id = ?
+                ORDER BY c.added_at, c.product_id
+            """, (self.user_id,))
+            rows = cursor.fetchall()
+
+        for row in rows:
+            if not row['is_available'] or row['store_name'] is None:
+                self._touch(row['product_id'])
+                continue
+            self._insert({
+                'product_id': row['product_id'],
+                'product_name': row['current_name'],
+                'price': row['current_price'],
+                'store_id': row['store_id'],
+                'store_name': row['store_name'],
+                'quantity': row['quantity']
+            })
+            if (row['current_name'], row['current_price']) != (row['product_name'], row['price']):
+                self._touch(row['product_id'])
+
+    def _reset(self):
+        self._items.clear()
+        self._cart.clear()
+        self._stores.clear()
+        self._store_views.clear()
+        self._total_cents = 0
+        self._items_count = 0
+
+    # Relê o carrinho com os dados atuais do cardápio (ex.: depois de um
+    # checkout recusado por preço alterado ou produto indisponível)
+    def revalidate(self):
+        self.flush()
+        with self._lock:
+            self._reset()
+            self._load()
+        self._emit("cleared")
+
+    def _insert(self, item):
+        store = self._stores.get(item['store_id'])
+        if store is None:
+            items = {}
+            store = self._stores[item['store_id']] = {
+                'store_id': item['store_id'],
+                'store_name': item['store_name'],
+                'items': items
             }
-        self._cart[product_id]['quantity'] += quantity
-    
+            self._store_views[item['store_id']] = MappingProxyType({
+                'store_id': item['store_id'],
+                'store_name': item['store_name'],
+                'items': MappingProxyType(items).values()
+            })
+        item_view = MappingProxyType(item)
+        self._items[item['product_id']] = item
+        self._cart[item['product_id']] = item_view
+        store['items'][item['product_id']] = item_view
+        self._account(item, item['quantity'])
+
+    def _discard(self, product_id):
+        item = self._items.pop(product_id)
+        del self._cart[product_id]
+        self._account(item, -item['quantity'])
+        store = self._stores[item['store_id']]
+        del store['items'][product_id]
+        if not store['items']:
+            del self._stores[item['store_id']]
+            del self._store_views[item['store_id']]
+
+    def _account(self, item, quantity_delta):
+        cents = _cents(item['price']) * quantity_delta
+        self._total_cents += cents
+        self._items_count += quantity_delta
+
+    def _touch(self, product_id):
+        self._dirty.add(product_id)
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def add_item(self, product_id, product_name, price, store_id, store_name, quantity=1):
+        with self._lock:
+            if product_id not in self._cart:
+                self._insert({
+                    'product_id': product_id,
+                    'product_name': product_name,
+                    'price': price,
+                    'store_id': store_id,
+                    'store_name': store_name,
+                    'quantity': quantity
+                })
+                kind = "added"
+            else:
+                self._set_quantity(product_id, self._cart[product_id]['quantity'] + quantity)
+                kind = "updated"
+            self._touch(product_id)
+        self._emit(kind, product_id)
+
+    def _set_quantity(self, product_id, quantity):
+        item = self._items[product_id]
+        self._account(item, quantity - item['quantity'])
+        item['quantity'] = quantity
+
     def remove_item(self, product_id):
-        if product_id in self._cart:
-            del self._cart[product_id]
-    
+        with self._lock:
+            item = self._cart.get(product_id)
+            if item is None:
+                return
+            self._discard(product_id)
+            self._touch(product_id)
+        self._emit("removed", product_id, item)
+
     def update_quantity(self, product_id, quantity):
-        if product_id in self._cart:
-            if quantity <= 0:
-                self.remove_item(product_id)
-            else:
-                self._cart[product_id]['quantity'] = quantity
-    
+        if quantity <= 0:
+            self.remove_item(product_id)
+            return
+        with self._lock:
+            if product_id not in self._cart:
+                return
+            self._set_quantity(product_id, quantity)
+            self._touch(product_id)
+        self._emit("updated", product_id)
+
     def get_cart(self):
-        return self._cart.copy()
-    
+        return self._cart_view
+
+    def get_item(self, product_id):
+        return self._cart.get(product_id)
+
     def get_total(self):
-        total = 0.0
-        for item in self._cart.values():
-            total += item['price'] * item['quantity']
-        return total
-    
+        return self._total_cents / 100
+
     def get_items_count(self):
-        count = 0
-        for item in self._cart.values():
-            count += item['quantity']
-        return count
-    
+        return self._items_count
+
     def clear(self):
-        self._cart = {}
-    
+        with self._lock:
+            for product_id in self._cart:
+                self._touch(product_id)
+            self._reset()
+        self._emit("cleared")
+
     def get_stores_in_cart(self):
-        stores = {}
-        for item in self._cart.values():
-            store_id = item['store_id']
-            if store_id not in stores:
-                stores[store_id] = {
-                    'store_id': store_id,
-                    'store_name': item['store_name'],
-                    'items': []
-                }
-            stores[store_id]['items'].append(item)
-        return stores
+        return self._stores_view
+
+    # Ouvintes são chamados na thread que alterou o carrinho (a do Tk)
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, kind, product_id=None, item=None):
+        if item is None and product_id is not None:
+            item = self._cart.get(product_id)
+        event = CartEvent(kind, product_id, item['store_id'] if item else None, item)
+        for listener in list(self._listeners):
+            listener(event)
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            dirty = self._dirty
+            self._dirty = set()
+            upserts = [
+                (self.user_id, item['product_id'], item['product_name'], item['price'],
+                 item['store_id'], item['store_name'], item['quantity'])
+                for item in (self._cart.get(product_id) for product_id in dirty)
+                if item is not None
+            ]
+            deletes = [(self.user_id, product_id) for product_id in dirty if product_id not in self._cart]
+
+        if not upserts and not deletes:
+            return
+
+        try:
+            # "with conn" faz commit (ou rollback) aqui mesmo quando a conexão
+            # é a que a thread já segura, como no checkout, que exige a
+            # conexão sem transação aberta
+            with get_db().connection() as conn, conn:
+                cursor = conn.cursor()
+                cursor.executemany("""
+                    INSERT INTO cart_items (user_id, product_id, product_name, price, store_id, store_name, quantity)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(user_id, product_id) DO UPDATE SET
+                        product_name = excluded.product_name,
+                        price = excluded.price,
+                        quantity = excluded.quantity
+                """, upserts)
+                cursor.executemany(
+                    "DELETE FROM cart_items WHERE user_id = ? AND product_id = ?",
+                    deletes
+                )
+        except sqlite3.Error as e:
+            # Mantém as alterações pendentes e agenda a próxima tentativa
+            logger.error("Erro ao salvar carrinho: %s", e)
+            with self._lock:
+                for product_id in dirty:
+                    self._touch(product_id)
+
+
+_carts = {}
+_carts_lock = threading.Lock()
+
+
+def get_cart_service(user_id):
+    with _carts_lock:
+        cart = _carts.get(user_id)
+        if cart is None:
+            cart = CartService(user_id)
+            _carts[user_id] = cart
+        return cart
 
 
+@atexit.register
+def flush_all_carts():
+    with _carts_lock:
+        carts = list(_carts.values())
+    for cart in carts:
+        cart.flush()
@@ -0,0 +1,133 @@
+import threading
+from collections import namedtuple
+from src.services.search_service import CATALOG_COLUMNS
+from src.services.event_bus import get_event_bus, PRODUCT_UPDATED, STORE_EDITED
+
+
+def catalog_sql(store_count=None):
+    # Catálogo inteiro, ou só as lojas informadas (recarga parcial)
+    where = f"WHERE s.id IN ({', '.join('?' * store_count)})" if store_count else ""
+    return f"""
+        SELECT {CATALOG_COLUMNS}
+        FROM stores s
+        LEFT JOIN products p ON s.id = p.store_id AND p.is_available = 1
+        {where}
+        ORDER BY s.name, p.name
+    """
+
+
+_CatalogRowBase = namedtuple("CatalogRow", [
+    "store_id", "store_name", "store_description",
+    "product_id", "product_name", "product_description",
+    "price", "product_image",
+])
+
+
+# Tupla compacta que também aceita row['coluna'], como o sqlite3.Row
+class CatalogRow(_CatalogRowBase):
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+
+# Cache do catálogo (lojas + produtos disponíveis) agrupado por loja. As telas
+# que alteram lojas ou produtos chamam invalidate_store(store_id), e as
+# alterações feitas em outros terminais chegam pelo barramento de eventos; na
+# próxima leitura só as lojas invalidadas são recarregadas do banco.
+class CatalogCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stores = None
+        self._full_stamp = 0
+        self._dirty = {}
+        self._stamp = 0
+        self._rows = None
+
+    def peek(self):
+        with self._lock:
+            return self._rows
+
+    def rows(self, conn):
+        with self._lock:
+            if self._rows is not None:
+                return self._rows
+            stamp = self._stamp
+            full = self._stores is None
+            dirty = list(self._dirty)
+
+        fetched = self._fetch(conn, None if full else dirty)
+
+        with self._lock:
+            if full:
+                if self._stores is None and self._full_stamp <= stamp:
+                    self._stores = fetched
+                stores = fetched
+            elif self._stores is None:
+                stores = None
+            else:
+                stores = self._stores
+                for store_id in dirty:
+                    if store_id in fetched:
+                        stores[store_id] = fetched[store_id]
+                    else:
+                        stores.pop(store_id, None)
+
+            if stores is not None:
+                # Invalidações feitas durante a consulta continuam pendentes
+                self._dirty = {store_id: s for store_id, s in self._dirty.items() if s > stamp}
+                rows = self._flatten(stores)
+                if not self._dirty and self._stores is stores:
+                    self._rows = rows
+                return rows
+
+        # O cache inteiro foi invalidado durante a consulta: recarrega tudo
+        return self.rows(conn)
+
+    def invalidate_store(self, store_id):
+        with self._lock:
+            self._stamp += 1
+            self._dirty[store_id] = self._stamp
+            self._rows = None
+
+    def invalidate(self):
+        with self._lock:
+            self._stamp += 1
+            self._full_stamp = self._stamp
+            self._stores = None
+            self._dirty = {}
+            self._rows = None
+
+    def _fetch(self, conn, store_ids):
+        if store_ids is not None and not store_ids:
+            return {}
+
+        cursor = conn.cursor()
+        if store_ids is None:
+            cursor.execute(catalog_sql())
+        else:
+            cursor.execute(catalog_sql(len(store_ids)), tuple(store_ids))
+
+        stores = {}
+        for row in cursor.fetchall():
+            stores.setdefault(row['store_id'], []).append(CatalogRow(*row))
+        return {store_id: tuple(rows) for store_id, rows in stores.items()}
+
+    def _flatten(self, stores):
+        ordered = sorted(stores.values(), key=lambda rows: (rows[0].store_name, rows[0].store_id))
+        return [row for rows in ordered for row in rows]
+
+
+_catalog_cache = None
+
+
+def get_catalog_cache():
+    global _catalog_cache
+    if _catalog_cache is None:
+        _catalog_cache = CatalogCache()
+        get_event_bus().subscribe(PRODUCT_UPDATED, lambda event: _catalog_cache.invalidate_store(event.store_id))
+        get_event_bus().subscribe(STORE_EDITED, lambda event: _catalog_cache.invalidate_store(event.store_id))
+    return _catalog_cache
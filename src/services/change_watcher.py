@@ -0,0 +1,34 @@
+import sqlite3
+from src.services.database import get_db
+
+
+# PRAGMA data_version muda sempre que outra conexão (deste ou de outro
+# processo) faz commit no banco. A conexão é exclusiva do observador e nunca
+# grava, então qualquer commit aparece. A leitura não toca em tabelas: as
+# telas podem consultar a cada poucos segundos e só buscam dados quando o
+# número muda.
+class ChangeWatcher:
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or get_db().db_path
+        self._conn = None
+
+    def version(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_change_watcher = None
+
+
+def get_change_watcher():
+    global _change_watcher
+    if _change_watcher is None:
+        _change_watcher = ChangeWatcher()
+    return _change_watcher
@@ -0,0 +1,112 @@
+import time
+import random
+import sqlite3
+from src.services.config import get_setting
+
+
+class CheckoutError(Exception):
+    pass
+
+
+# O carrinho guarda cópias de nome e preço; se o cardápio mudou desde então,
+# o pedido é recusado e o carrinho precisa ser relido (CartService.revalidate)
+class StaleCartError(CheckoutError):
+    pass
+
+
+def _cents(price):
+    return int(round(price * 100))
+
+
+def _is_busy(error):
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(error) or "busy" in str(error)
+
+
+def _check_items(cursor, stores):
+    items = [(store_id, item) for store_id, store in stores.items() for item in store['items']]
+    marks = ", ".join("?" for _ in items)
+    cursor.execute(
+        f"SELECT id, name, price, store_id, is_available FROM products WHERE id IN ({marks})",
+        [item['product_id'] for _, item in items]
+    )
+    current = {row[0]: row for row in cursor.fetchall()}
+
+    unavailable = []
+    changed = []
+    for store_id, item in items:
+        row = current.get(item['product_id'])
+        if row is None or not row[4] or row[3] != store_id:
+            unavailable.append(item.get('product_name') or str(item['product_id']))
+        elif _cents(row[2]) != _cents(item['price']):
+            changed.append(f"{row[1]} (agora R$ {row[2]:.2f})")
+
+    problems = []
+    if unavailable:
+        problems.append("Indisponíveis: " + ", ".join(unavailable))
+    if changed:
+        problems.append("Preço alterado: " + ", ".join(changed))
+    if problems:
+        raise StaleCartError("O cardápio mudou. " + ". ".join(problems) + ".")
+
+
+def _insert_orders(cursor, client_id, stores):
+    _check_items(cursor, stores)
+    order_ids = {}
+    for store_id, store in stores.items():
+        items = store['items']
+        total = sum(item['price'] * item['quantity'] for item in items)
+
+        cursor.execute(
+            "INSERT INTO orders (client_id, store_id, total_amount, status) VALUES (?, ?, ?, ?)",
+            (client_id, store_id, total, 'Pendente')
+        )
+        order_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)",
+            [(order_id, item['product_id'], item['quantity'], item['price']) for item in items]
+        )
+        order_ids[store_id] = order_id
+
+        # O carrinho salvo sai na mesma transação: se o pedido foi gravado,
+        # uma nova tentativa não encontra os itens de novo
+        cursor.executemany(
+            "DELETE FROM cart_items WHERE user_id = ? AND product_id = ?",
+            [(client_id, item['product_id']) for item in items]
+        )
+    return order_ids
+
+
+# Cria um pedido por loja do carrinho (CartService.get_stores_in_cart) numa
+# única transação: ou todos os pedidos são gravados, ou nenhum. BEGIN
+# IMMEDIATE pega o lock de escrita logo no início; se outro terminal estiver
+# gravando (SQLITE_BUSY), a transação inteira é repetida com espera crescente.
+def place_orders(conn, client_id, stores, retries=None, backoff=0.05):
+    if not stores:
+        raise CheckoutError("Carrinho vazio.")
+    if retries is None:
+        retries = get_setting("checkout_retries")
+
+    if conn.in_transaction:
+        raise CheckoutError("A conexão já tem uma transação aberta.")
+
+    attempt = 0
+    while True:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            order_ids = _insert_orders(cursor, client_id, stores)
+            conn.commit()
+            return order_ids
+        except CheckoutError:
+            conn.rollback()
+            raise
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.rollback()
+            if not (isinstance(e, sqlite3.OperationalError) and _is_busy(e)) or attempt >= retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+            attempt += 1
@@ -0,0 +1,68 @@
+import os
+import json
+from pathlib import Path
+
+
+CONFIG_PATH = Path(__file__).parent.parent.parent / "urbanfood.json"
+
+# Valores padrão. Qualquer chave pode ser sobrescrita no urbanfood.json ou
+# pela variável de ambiente URBANFOOD_<CHAVE> (ex.: URBANFOOD_DB_PROFILE=durable).
+DEFAULTS = {
+    "db_profile": "terminal",
+    "db_pragmas": {},
+    "db_pool_size": 8,
+    "db_pool_timeout": 10.0,
+    "query_workers": 4,
+    "query_poll_interval": 25,
+    "orders_page_size": 20,
+    "search_limit": 200,
+    "search_debounce_ms": 250,
+    "thumbnail_size": 96,
+    "image_cache_mb": 32,
+    "image_workers": 2,
+    "checkout_retries": 3,
+    "cart_flush_ms": 1000,
+    "event_poll_ms": 1000,
+    "event_retention_hours": 24,
+}
+
+_config = None
+
+
+def _coerce(value, default):
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "sim")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    if isinstance(default, (dict, list)):
+        return json.loads(value)
+    return value
+
+
+def load_config(path=None):
+    path = Path(path) if path else CONFIG_PATH
+    config = {key: value for key, value in DEFAULTS.items()}
+
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            config.update(json.load(f))
+
+    for key, default in DEFAULTS.items():
+        env_value = os.environ.get(f"URBANFOOD_{key.upper()}")
+        if env_value is not None:
+            config[key] = _coerce(env_value, default)
+
+    return config
+
+
+def get_config():
+    global _config
+    if _config is None:
+        _config = load_config()
+    return _config
+
+
+def get_setting(key, default=None):
+    return get_config().get(key, DEFAULTS.get(key, default))
@@ -0,0 +1,200 @@
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# Marca da conexão fixa guardada no threading.local da thread. Quando a
+# thread termina, o threading.local é descartado e o finalizer devolve a
+# conexão ao pool.
+class _Pin:
+    __slots__ = ("conn", "finalizer", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.finalizer = None
+
+
+class ConnectionPool:
+
+    def __init__(self, db_path, profile, apply_profile, max_size=8, timeout=10.0):
+        self.db_path = str(db_path)
+        self.profile = profile
+        self.apply_profile = apply_profile
+        self.max_size = max_size
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self._idle = {False: [], True: []}
+        self._pinned = {}
+        self._size = 0
+        self._local = threading.local()
+        self._closed = False
+
+    def _connect(self, readonly):
+        busy_timeout = self.profile.get("busy_timeout", 5000) / 1000
+
+        if readonly:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=busy_timeout, check_same_thread=False)
+            # Conexão somente leitura não pode trocar o journal_mode
+            profile = {k: v for k, v in self.profile.items() if k != "journal_mode"}
+            self.apply_profile(conn, profile)
+            conn.execute("PRAGMA query_only = 1")
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=busy_timeout, check_same_thread=False)
+            self.apply_profile(conn, self.profile)
+
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _acquire(self, readonly):
+        deadline = time.monotonic() + self.timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("O pool de conexões foi fechado.")
+
+                if self._idle[readonly]:
+                    conn = self._idle[readonly].pop()
+                    break
+
+                if self._size < self.max_size:
+                    conn = None
+                    self._size += 1
+                    break
+
+                # Libera uma conexão ociosa do outro tipo para abrir espaço
+                if self._idle[not readonly]:
+                    self._discard(self._idle[not readonly].pop())
+                    conn = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"Nenhuma conexão livre após {self.timeout:.1f}s.")
+                self._cond.wait(remaining)
+
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                self._discard(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect(readonly)
+        except sqlite3.Error:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        return conn
+
+    def _release(self, conn, readonly):
+        with self._cond:
+            if self._closed:
+                self._discard(conn)
+                self._size -= 1
+            else:
+                self._idle[readonly].append(conn)
+            self._cond.notify()
+
+    def _held(self):
+        held = getattr(self._local, "held", None)
+        if held is None:
+            held = self._local.held = {}
+        return held
+
+    @contextmanager
+    def connection(self, readonly=False):
+        # A conexão fixa da thread (get_connection) também atende escritas,
+        # para não abrir duas conexões de escrita na mesma thread
+        held = self._held()
+        if readonly in held:
+            yield held[readonly]
+            return
+
+        pinned = not readonly and getattr(self._local, "pin", None) is not None
+        conn = self.thread_connection() if pinned else self._acquire(readonly)
+        held[readonly] = conn
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            del held[readonly]
+            if not pinned:
+                self._release(conn, readonly)
+
+    def thread_connection(self):
+        pin = getattr(self._local, "pin", None)
+
+        if pin is not None and not pin.conn.in_transaction and not self._is_healthy(pin.conn):
+            pin.finalizer.detach()
+            self._unpin(pin.conn, discard=True)
+            pin = self._local.pin = None
+
+        if pin is None:
+            conn = self._acquire(False)
+            pin = _Pin(conn)
+            with self._cond:
+                self._pinned[id(conn)] = conn
+            pin.finalizer = weakref.finalize(pin, self._unpin, conn)
+            self._local.pin = pin
+        return pin.conn
+
+    def _unpin(self, conn, discard=False):
+        with self._cond:
+            if self._pinned.pop(id(conn), None) is None:
+                # O pool já foi fechado e a conexão descartada
+                return
+
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        if discard:
+            self._discard(conn)
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+        else:
+            self._release(conn, False)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            connections = self._idle[False] + self._idle[True] + list(self._pinned.values())
+            self._size -= len(connections)
+            self._idle = {False: [], True: []}
+            self._pinned = {}
+            self._cond.notify_all()
+
+        for conn in connections:
+            self._discard(conn)
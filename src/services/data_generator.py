@@ -0,0 +1,278 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+from itertools import accumulate
+
+
+# Tamanhos prontos para testes de escala (lojas, produtos, clientes, pedidos).
+# "large" gera cerca de 10 milhões de itens de pedido.
+SCALES = {
+    "small": (20, 1000, 1000, 10000),
+    "medium": (200, 20000, 50000, 500000),
+    "large": (1000, 100000, 500000, 4000000),
+}
+
+STORE_KINDS = ["Pizzaria", "Hamburgueria", "Lanchonete", "Restaurante", "Padaria", "Sorveteria",
+               "Pastelaria", "Açaiteria", "Churrascaria", "Cafeteria", "Sushi", "Doceria"]
+STORE_NAMES = ["do Zé", "da Praça", "Sabor Urbano", "Bom Gosto", "Central", "da Esquina",
+               "Estrela", "Família", "Tropical", "do Porto", "Imperial", "Nordestina"]
+PRODUCT_BASES = ["Pizza", "Hambúrguer", "Pastel", "Coxinha", "Açaí", "Sorvete", "Tapioca",
+                 "Cuscuz", "Baião de dois", "Escondidinho", "Salada", "Sanduíche", "Suco",
+                 "Refrigerante", "Bolo", "Temaki", "Yakisoba", "Marmita", "Cachorro-quente"]
+PRODUCT_FLAVORS = ["de calabresa", "de frango", "de carne de sol", "de queijo", "vegano",
+                   "especial", "da casa", "tradicional", "duplo", "com bacon", "de chocolate",
+                   "de morango", "de cupuaçu", "de tapioca", "light", "completo", "gigante"]
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Henrique",
+               "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael",
+               "Sofia", "Thiago", "Vitória", "William"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Ferreira",
+              "Almeida", "Carvalho", "Gomes", "Martins", "Rocha", "Ribeiro", "Freitas"]
+
+# Itens por pedido e quantidade por item (valor: peso)
+CART_SIZES = {1: 35, 2: 28, 3: 17, 4: 10, 5: 5, 6: 2, 7: 1, 8: 1, 10: 1}
+QUANTITIES = {1: 75, 2: 18, 3: 5, 4: 2}
+
+# Pedidos das últimas horas ainda estão em andamento; os antigos já fecharam
+RECENT_SECONDS = 2 * 3600
+RECENT_STATUSES = {"Pendente": 40, "Em preparo": 30, "Pronto": 20, "Entregue": 8, "Cancelado": 2}
+OLD_STATUSES = {"Entregue": 93, "Cancelado": 7}
+
+
+def _zipf_cum_weights(count, skew):
+    # Poucos itens concentram a maior parte da demanda
+    return list(accumulate(1 / (rank + 1) ** skew for rank in range(count)))
+
+
+def _picker(weights):
+    population = list(weights)
+    cum_weights = list(accumulate(weights.values()))
+    return lambda rng: rng.choices(population, cum_weights=cum_weights)[0]
+
+
+def _timestamp(seconds):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(seconds))
+
+
+def _next_id(cursor, table):
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def _last_event_id(cursor):
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM change_events")
+    return cursor.fetchone()[0]
+
+
+def _discard_events(cursor, after_id):
+    # Os eventos entre terminais não fazem sentido para dados gerados em lote.
+    # Os triggers continuam no lugar e o que eles gravaram nesta transação sai
+    # antes do commit, então uma falha no meio da carga não altera o esquema.
+    cursor.execute("DELETE FROM change_events WHERE id > ?", (after_id,))
+
+
+class DataGenerator:
+
+    def __init__(self, conn, seed=None, days=365, batch_size=50000, log=print):
+        self.conn = conn
+        self.rng = random.Random(seed)
+        self.days = days
+        self.batch_size = batch_size
+        self.log = log
+
+    def _insert_users(self, cursor, count, user_type, prefix):
+        first_id = _next_id(cursor, "users")
+        rows = []
+        for offset in range(count):
+            user_id = first_id + offset
+            name = f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+            rows.append((user_id, name, f"{prefix}{user_id}@exemplo.com", "senha123", user_type))
+        cursor.executemany(
+            "INSERT INTO users (id, name, email, password, user_type) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        return list(range(first_id, first_id + count))
+
+    def _insert_stores(self, cursor, owner_ids):
+        first_id = _next_id(cursor, "stores")
+        rows = []
+        for offset, owner_id in enumerate(owner_ids):
+            name = f"{self.rng.choice(STORE_KINDS)} {self.rng.choice(STORE_NAMES)} {first_id + offset}"
+            rows.append((first_id + offset, owner_id, name, f"Loja gerada para testes: {name}"))
+        cursor.executemany(
+            "INSERT INTO stores (id, user_id, name, description) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        return list(range(first_id, first_id + len(owner_ids)))
+
+    def _insert_products(self, cursor, store_ids, count):
+        # Lojas mais populares também têm cardápios maiores
+        store_weights = _zipf_cum_weights(len(store_ids), 0.5)
+        counts = dict.fromkeys(store_ids, 1)
+        for store_id in self.rng.choices(store_ids, cum_weights=store_weights, k=max(0, count - len(store_ids))):
+            counts[store_id] += 1
+
+        product_id = _next_id(cursor, "products")
+        menus = {}
+        rows = []
+        for store_id, menu_size in counts.items():
+            menu = []
+            for _ in range(menu_size):
+                name = f"{self.rng.choice(PRODUCT_BASES)} {self.rng.choice(PRODUCT_FLAVORS)}"
+                price = round(max(3.0, round(self.rng.lognormvariate(3.2, 0.5))) - 0.1, 2)
+                available = 1 if self.rng.random() < 0.95 else 0
+                rows.append((product_id, store_id, name, f"{name} preparado na hora", price, available))
+                menu.append((product_id, price))
+                product_id += 1
+            menus[store_id] = (menu, _zipf_cum_weights(len(menu), 1.0))
+
+        cursor.executemany(
+            "INSERT INTO products (id, store_id, name, description, price, is_available) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        return menus
+
+    def _order_batches(self, cursor, client_ids, store_ids, menus, count):
+        rng = self.rng
+        store_weights = _zipf_cum_weights(len(store_ids), 1.1)
+        client_weights = _zipf_cum_weights(len(client_ids), 0.8)
+        pick_cart_size = _picker(CART_SIZES)
+        pick_quantity = _picker(QUANTITIES)
+        pick_recent = _picker(RECENT_STATUSES)
+        pick_old = _picker(OLD_STATUSES)
+
+        now = time.time()
+        start = now - self.days * 86400
+        # Um intervalo por pedido, com posição sorteada dentro dele: ids crescem
+        # junto com created_at, como no uso real, e o último pedido fica perto de agora
+        gap = self.days * 86400 / max(count, 1)
+        order_id = _next_id(cursor, "orders")
+        sequence = 0
+
+        remaining = count
+        while remaining > 0:
+            size = min(self.batch_size, remaining)
+            remaining -= size
+            stores = rng.choices(store_ids, cum_weights=store_weights, k=size)
+            clients = rng.choices(client_ids, cum_weights=client_weights, k=size)
+
+            orders = []
+            items = []
+            for store_id, client_id in zip(stores, clients):
+                created = start + (sequence + rng.random()) * gap
+                sequence += 1
+                menu, menu_weights = menus[store_id]
+                products = set(rng.choices(range(len(menu)), cum_weights=menu_weights, k=pick_cart_size(rng)))
+
+                total = 0.0
+                for index in products:
+                    product_id, price = menu[index]
+                    quantity = pick_quantity(rng)
+                    total += price * quantity
+                    items.append((order_id, product_id, quantity, price))
+
+                if now - created < RECENT_SECONDS:
+                    status = pick_recent(rng)
+                else:
+                    status = pick_old(rng)
+                updated = created if status == "Pendente" else min(now, created + rng.uniform(600, 5400))
+                orders.append((order_id, client_id, store_id, round(total, 2), status,
+                               _timestamp(created), _timestamp(updated)))
+                order_id += 1
+
+            yield orders, items
+
+    def generate(self, stores, products, clients, orders):
+        cursor = self.conn.cursor()
+        if self.conn.in_transaction:
+            self.conn.commit()
+
+        cursor.execute("BEGIN")
+        try:
+            last_event_id = _last_event_id(cursor)
+            store_owner_ids = self._insert_users(cursor, stores, "store", "loja")
+            store_ids = self._insert_stores(cursor, store_owner_ids)
+            client_ids = self._insert_users(cursor, clients, "client", "cliente")
+            menus = self._insert_products(cursor, store_ids, products)
+            _discard_events(cursor, last_event_id)
+            self.conn.commit()
+            self.log(f"{stores} lojas, {products} produtos e {clients} clientes gravados")
+
+            written_orders = 0
+            written_items = 0
+            started = time.monotonic()
+            for batch_orders, batch_items in self._order_batches(cursor, client_ids, store_ids, menus, orders):
+                # Uma transação por lote: commits raros e memória limitada
+                cursor.execute("BEGIN")
+                last_event_id = _last_event_id(cursor)
+                cursor.executemany("""
+                    INSERT INTO orders (id, client_id, store_id, total_amount, status, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, batch_orders)
+                cursor.executemany(
+                    "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)",
+                    batch_items
+                )
+                _discard_events(cursor, last_event_id)
+                self.conn.commit()
+
+                written_orders += len(batch_orders)
+                written_items += len(batch_items)
+                elapsed = time.monotonic() - started
+                self.log(f"{written_orders}/{orders} pedidos, {written_items} itens ({elapsed:.0f}s)")
+        finally:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+
+        cursor.execute("ANALYZE")
+        return written_orders, written_items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.services.data_generator",
+        description="Preenche um banco com lojas, produtos, clientes e pedidos sintéticos."
+    )
+    parser.add_argument("database", help="caminho do banco (criado se não existir)")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--stores", type=int)
+    parser.add_argument("--products", type=int)
+    parser.add_argument("--clients", type=int)
+    parser.add_argument("--orders", type=int)
+    parser.add_argument("--days", type=int, default=365, help="período coberto pelos pedidos")
+    parser.add_argument("--batch-size", type=int, default=50000, help="pedidos por transação")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    stores, products, clients, orders = SCALES[args.scale]
+    stores = args.stores or stores
+    products = max(args.products or products, stores)
+    clients = args.clients or clients
+    orders = args.orders if args.orders is not None else orders
+
+    from src.services.database import Database
+
+    db = Database(os.path.abspath(args.database))
+    try:
+        with db.connection() as conn:
+            # Só para a carga: sem fsync a cada commit e cache maior
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("PRAGMA cache_size = -262144")
+            started = time.monotonic()
+            written_orders, written_items = DataGenerator(
+                conn, seed=args.seed, days=args.days, batch_size=args.batch_size
+            ).generate(stores, products, clients, orders)
+    except sqlite3.Error as e:
+        print(f"Erro ao gerar dados: {e}")
+        return 1
+    finally:
+        db.close()
+
+    print(f"Concluído: {written_orders} pedidos e {written_items} itens em {time.monotonic() - started:.0f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,75 @@
-import sqlite3
 import os
 from pathlib import Path
+from src.services.migrations import migrate
+from src.services.config import get_setting
+from src.services.connection_pool import ConnectionPool
+
+
+# Perfis de conexão. "terminal" é o padrão: WAL permite que os terminais de
+# loja e cliente leiam o banco enquanto pedidos são gravados.
+CONNECTION_PROFILES = {
+    "terminal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 134217728,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+    "legacy": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+}
+
+# journal_mode vem primeiro: os outros PRAGMAs dependem do modo do journal
+PRAGMA_ORDER = ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")
+
+
+def get_connection_profile(name=None):
+    if name is None:
+        name = get_setting("db_profile")
+    
+    if name not in CONNECTION_PROFILES:
+        raise ValueError(f"Perfil de conexão desconhecido: {name}")
+    
+    profile = dict(CONNECTION_PROFILES[name])
+    profile.update(get_setting("db_pragmas") or {})
+    return profile
+
+
+def apply_connection_profile(conn, profile):
+    for pragma in PRAGMA_ORDER:
+        if pragma in profile:
+            value = profile[pragma]
+            if not isinstance(value, int) and not str(value).isalnum():
+                raise ValueError(f"Valor inválido para PRAGMA {pragma}: {value}")
+            conn.execute(f"PRAGMA {pragma} = {value}").fetchall()
 
 
 class Database:
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, profile: str = None):
         if db_path is None:
             # Caminho padrão: database/database.db
             base_dir = Path(__file__).parent.parent.parent
             db_path = base_dir / "database" / "database.db"
         
         self.db_path = db_path
-        self.conn = None
+        self.profile = get_connection_profile(profile)
+        self.pool = None
         self._ensure_database_dir()
         self._initialize_database()
     
@@ -20,102 +77,52 @@ class Database:
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
     
     def _initialize_database(self):
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row 
-        self._create_tables()
+        self.pool = ConnectionPool(
+            self.db_path,
+            self.profile,
+            apply_connection_profile,
+            max_size=get_setting("db_pool_size"),
+            timeout=get_setting("db_pool_timeout")
+        )
+        self._run_migrations()
         self._insert_default_admin()
     
-    def _create_tables(self):
-        cursor = self.conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                user_type TEXT NOT NULL CHECK(user_type IN ('client', 'store', 'admin')),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active INTEGER DEFAULT 1,
-                is_blocked INTEGER DEFAULT 0
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS stores (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                description TEXT,
-                image_path TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                store_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                description TEXT,
-                price REAL NOT NULL,
-                image_path TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_available INTEGER DEFAULT 1,
-                FOREIGN KEY (store_id) REFERENCES stores(id) ON DELETE CASCADE
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                client_id INTEGER NOT NULL,
-                store_id INTEGER NOT NULL,
-                total_amount REAL NOT NULL,
-                status TEXT NOT NULL DEFAULT 'Pendente' 
-                    CHECK(status IN ('Pendente', 'Em preparo', 'Pronto', 'Entregue', 'Cancelado')),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (client_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (store_id) REFERENCES stores(id) ON DELETE CASCADE
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS order_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_id INTEGER NOT NULL,
-                product_id INTEGER NOT NULL,
-                quantity INTEGER NOT NULL DEFAULT 1,
-                price REAL NOT NULL,
-                FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
-                FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
-            )
-        """)
-        
-        self.conn.commit()
+    @property
+    def conn(self):
+        return self.get_connection()
+    
+    def _run_migrations(self):
+        with self.connection() as conn:
+            migrate(conn)
     
     def _insert_default_admin(self):
-        cursor = self.conn.cursor()
-        
-        cursor.execute("SELECT id FROM users WHERE user_type = 'admin' LIMIT 1")
-        if cursor.fetchone() is None:
-            cursor.execute("""
-                INSERT INTO users (name, email, password, user_type)
-                VALUES (?, ?, ?, ?)
-            """, ("Administrador", "admin@urbanfood.com", "admin123", "admin"))
-            self.conn.commit()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT id FROM users WHERE user_type = 'admin' LIMIT 1")
+            if cursor.fetchone() is None:
+                # OR IGNORE: outro terminal abrindo ao mesmo tempo pode ter
+                # criado o administrador depois da consulta acima
+                cursor.execute("""
+                    INSERT OR IGNORE INTO users (name, email, password, user_type)
+                    VALUES (?, ?, ?, ?)
+                """, ("Administrador", "admin@urbanfood.com", "admin123", "admin"))
     
     def get_connection(self):
-        if self.conn is None:
+        # Compatibilidade: conexão de escrita fixa da thread atual
+        if self.pool is None:
+            self._initialize_database()
+        return self.pool.thread_connection()
+    
+    def connection(self, readonly=False):
+        if self.pool is None:
             self._initialize_database()
-        return self.conn
+        return self.pool.connection(readonly)
     
     def close(self):
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        if self.pool:
+            self.pool.close()
+            self.pool = None
     
     def __enter__(self):
         return self
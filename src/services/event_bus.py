@@ -0,0 +1,127 @@
+import time
+from collections import namedtuple
+from src.services.database import get_db
+from src.services.config import get_setting
+from src.services.change_watcher import get_change_watcher
+from src.services.query_executor import get_query_executor
+from src.services.log import logger
+
+
+# Tipos de evento gravados pelos triggers de change_events (ver migrations)
+ORDER_PLACED = "order_placed"
+ORDER_STATUS = "order_status"
+PRODUCT_UPDATED = "product_updated"
+STORE_EDITED = "store_edited"
+
+Event = namedtuple("Event", ["id", "kind", "entity_id", "store_id", "client_id", "created_at"])
+
+PRUNE_INTERVAL = 3600
+PRUNE_SQL = "DELETE FROM change_events WHERE created_at < datetime('now', ?)"
+
+
+# Barramento de alterações entre processos. Cada terminal (main.py) lê o
+# diário change_events a partir do último id visto e repassa os eventos aos
+# ouvintes na thread do Tk. A leitura só acontece quando PRAGMA data_version
+# indica que alguém gravou no banco; sem alterações, o custo é só o PRAGMA.
+class EventBus:
+
+    def __init__(self, poll_interval=None, retention_hours=None):
+        self.poll_interval = poll_interval or get_setting("event_poll_ms")
+        self.retention_hours = retention_hours or get_setting("event_retention_hours")
+        self._listeners = {}
+        self._root = None
+        self._last_id = None
+        self._version = None
+        # A primeira limpeza espera um intervalo inteiro, longe da abertura
+        self._last_prune = time.monotonic()
+
+    def start(self, widget):
+        if self._root is not None:
+            return
+        self._root = widget.nametowidget(".")
+        # A versão é lida antes do último id: um commit entre as duas
+        # leituras é lido de novo no primeiro ciclo, nunca perdido
+        self._version = get_change_watcher().version()
+        with get_db().connection(readonly=True) as conn:
+            self._last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM change_events").fetchone()[0]
+        self._root.after(self.poll_interval, self._poll)
+
+    def subscribe(self, kind, listener):
+        self._listeners.setdefault(kind, []).append(listener)
+
+    def unsubscribe(self, kind, listener):
+        listeners = self._listeners.get(kind, [])
+        if listener in listeners:
+            listeners.remove(listener)
+
+    # O PRAGMA e a leitura do diário rodam no executor; só a entrega aos
+    # ouvintes acontece na thread do Tk. O próximo ciclo é agendado quando o
+    # anterior termina, então nunca há duas leituras ao mesmo tempo.
+    def _poll(self):
+        version, last_id = self._version, self._last_id
+        get_query_executor().run(
+            self._root,
+            "events.poll",
+            lambda conn: self._read(conn, version, last_id),
+            self._on_read,
+            self._on_poll_error,
+            readonly=True
+        )
+
+    def _read(self, conn, version, last_id):
+        current = get_change_watcher().version()
+        if current == version:
+            return current, []
+
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, kind, entity_id, store_id, client_id, created_at
+            FROM change_events
+            WHERE id > ?
+            ORDER BY id
+        """, (last_id,))
+        return current, [Event(*row) for row in cursor.fetchall()]
+
+    def _on_read(self, result):
+        self._version, events = result
+        if events:
+            self._last_id = events[-1].id
+        for event in events:
+            self._dispatch(event)
+
+        if time.monotonic() - self._last_prune > PRUNE_INTERVAL:
+            self._last_prune = time.monotonic()
+            get_query_executor().run(
+                self._root,
+                "events.prune",
+                self.prune,
+                lambda deleted: None,
+                lambda e: logger.error("Erro ao limpar eventos antigos", exc_info=e),
+                readonly=False
+            )
+        self._root.after(self.poll_interval, self._poll)
+
+    def _on_poll_error(self, error):
+        logger.error("Erro ao ler eventos", exc_info=error)
+        self._root.after(self.poll_interval, self._poll)
+
+    def _dispatch(self, event):
+        for listener in list(self._listeners.get(event.kind, [])):
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Erro ao tratar evento %s", event.kind)
+
+    def prune(self, conn):
+        cursor = conn.execute(PRUNE_SQL, (f"-{self.retention_hours} hours",))
+        return cursor.rowcount
+
+
+_event_bus = None
+
+
+def get_event_bus():
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = EventBus()
+    return _event_bus
@@ -0,0 +1,199 @@
+import heapq
+import itertools
+import queue
+import threading
+import time
+import tkinter as tk
+from src.services.config import get_setting
+from src.services.image_service import get_image_cache, thumbnail_key, decode_thumbnail
+from src.services.log import logger
+
+
+VISIBLE = 0
+HIDDEN = 1
+
+# Uma falha vale por esse tempo; depois a chave é decodificada de novo (o
+# arquivo pode ainda estar sendo copiado, ou ter sido corrigido)
+FAILED_RETRY_SECONDS = 30
+
+
+class _Request:
+
+    def __init__(self, decode, priority):
+        self.decode = decode
+        self.priority = priority
+        self.running = False
+        self.callbacks = []
+
+
+# Decodifica imagens em threads de fundo e entrega o PhotoImage na thread do
+# Tk via after(). Cada chave é decodificada uma vez e o resultado vai para o
+# cache de imagens. Pedidos de linhas que saíram da tela perdem prioridade.
+# Falhas também ficam registradas por FAILED_RETRY_SECONDS: a chave não é
+# decodificada de novo a cada bind. load(), prioritize() e os callbacks rodam
+# na thread principal.
+class ImageLoader:
+
+    def __init__(self, max_workers=2, poll_interval=25):
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._heap = []
+        self._requests = {}
+        self._results = queue.SimpleQueue()
+        self._seq = itertools.count()
+        self._workers = []
+        self._root = None
+        self._polling = False
+        # chave -> instante (time.monotonic) da falha
+        self._failed = {}
+
+    def load(self, widget, key, decode, callback, visible=True):
+        photo = get_image_cache().get(key)
+        if photo is not None:
+            return photo
+        failed_at = self._failed.get(key)
+        if failed_at is not None:
+            if time.monotonic() - failed_at < FAILED_RETRY_SECONDS:
+                callback(None)
+                return None
+            del self._failed[key]
+
+        priority = VISIBLE if visible else HIDDEN
+        with self._cond:
+            request = self._requests.get(key)
+            if request is None:
+                request = _Request(decode, priority)
+                self._requests[key] = request
+                self._push(key, priority)
+            elif priority < request.priority and not request.running:
+                request.priority = priority
+                self._push(key, priority)
+            request.callbacks.append((widget, callback))
+            self._start_workers()
+
+        self._root = widget.nametowidget(".")
+        if not self._polling:
+            self._polling = True
+            self._root.after(self.poll_interval, self._poll)
+        return None
+
+    def prioritize(self, visible_keys):
+        with self._cond:
+            for key, request in self._requests.items():
+                if request.running:
+                    continue
+                priority = VISIBLE if key in visible_keys else HIDDEN
+                if priority != request.priority:
+                    request.priority = priority
+                    self._push(key, priority)
+
+    def _push(self, key, priority):
+        # Mudança de prioridade empilha uma entrada nova; a antiga é ignorada
+        heapq.heappush(self._heap, (priority, next(self._seq), key))
+        self._cond.notify()
+
+    def _start_workers(self):
+        while len(self._workers) < min(self.max_workers, len(self._requests)):
+            worker = threading.Thread(target=self._work, name="urbanfood-image", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                priority, _, key = heapq.heappop(self._heap)
+                request = self._requests.get(key)
+                if request is None or request.running or request.priority != priority:
+                    continue
+                request.running = True
+
+            try:
+                self._results.put((key, request.decode(), None))
+            except Exception as e:
+                self._results.put((key, None, e))
+
+    def _poll(self):
+        from PIL import ImageTk
+
+        while True:
+            try:
+                key, image, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            with self._cond:
+                request = self._requests.pop(key, None)
+            if request is None:
+                continue
+
+            photo = None
+            if error is None:
+                photo = ImageTk.PhotoImage(image)
+                get_image_cache().put(key, photo)
+            else:
+                self._failed[key] = time.monotonic()
+                if isinstance(error, FileNotFoundError):
+                    logger.warning("Imagem não encontrada: %s", key[0])
+                else:
+                    logger.error("Erro ao carregar imagem %s", key[0], exc_info=error)
+
+            for widget, callback in request.callbacks:
+                try:
+                    alive = widget.winfo_exists()
+                except Exception:
+                    alive = False
+                if alive:
+                    callback(photo)
+
+        with self._cond:
+            busy = bool(self._requests)
+        if busy:
+            self._root.after(self.poll_interval, self._poll)
+        else:
+            self._polling = False
+
+
+_loader_instance = None
+
+
+def get_image_loader():
+    global _loader_instance
+    if _loader_instance is None:
+        _loader_instance = ImageLoader(
+            max_workers=get_setting("image_workers"),
+            poll_interval=get_setting("query_poll_interval")
+        )
+    return _loader_instance
+
+
+_placeholders = {}
+
+
+def get_placeholder(size, color="#e0e0e0"):
+    photo = _placeholders.get((size, color))
+    if photo is None:
+        photo = tk.PhotoImage(width=size, height=size)
+        photo.put(color, to=(0, 0, size, size))
+        _placeholders[(size, color)] = photo
+    return photo
+
+
+def _show_image(label, photo):
+    label.config(image=photo)
+    label.image = photo
+
+
+def bind_thumbnail(label, image_path, size):
+    # Linhas são reaproveitadas: a imagem só entra se o label ainda mostra o mesmo produto
+    key = thumbnail_key(image_path, size)
+    label.image_key = key
+
+    def swap(photo):
+        if photo is not None and getattr(label, "image_key", None) == key:
+            _show_image(label, photo)
+
+    photo = get_image_loader().load(label, key, lambda: decode_thumbnail(image_path, size), swap)
+    _show_image(label, photo or get_placeholder(size))
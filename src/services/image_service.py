@@ -0,0 +1,169 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path, PureWindowsPath
+from src.services.config import get_setting
+from src.services.log import logger
+
+
+ASSETS_DIR = Path(__file__).parent.parent.parent / "assets"
+THUMBNAILS_DIR = ASSETS_DIR / "thumbnails"
+OBJECTS_DIR = ASSETS_DIR / "objects"
+
+
+def resolve_image_path(image_path):
+    if not image_path:
+        return None
+
+    path = Path(image_path)
+    if not path.is_absolute():
+        path = ASSETS_DIR.parent / path
+    if path.exists():
+        return path
+
+    # Caminho gravado em outra instalação (ex.: absoluto do Windows): procura
+    # o arquivo pelo nome nas pastas de assets
+    name = PureWindowsPath(image_path).name
+    for folder in ("products", "stores"):
+        candidate = ASSETS_DIR / folder / name
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def thumbnail_base(image_path):
+    # Arquivos do armazenamento por conteúdo não mudam: o próprio hash do
+    # nome identifica a miniatura. Nos demais, o nome depende do caminho e da
+    # data de modificação, e substituir a imagem original gera uma miniatura nova.
+    source = Path(image_path)
+    if source.resolve().parent.parent == OBJECTS_DIR.resolve():
+        return source.stem
+    stat = source.stat()
+    digest = hashlib.sha1(f"{source.resolve()}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:16]
+    return f"{source.stem}_{digest}"
+
+
+def _thumbnail_name(image_path, size):
+    return f"{thumbnail_base(image_path)}_{size}.jpg"
+
+
+def create_thumbnail(image_path, size=None):
+    from PIL import Image, ImageOps
+
+    size = size or get_setting("thumbnail_size")
+    THUMBNAILS_DIR.mkdir(parents=True, exist_ok=True)
+    thumb_path = THUMBNAILS_DIR / _thumbnail_name(image_path, size)
+    if thumb_path.exists():
+        return thumb_path
+
+    with Image.open(image_path) as img:
+        # JPEG: decodifica já reduzido (1/2, 1/4, 1/8) em vez do tamanho cheio
+        img.draft("RGB", (size * 2, size * 2))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGBA", img.size, "white")
+            background.alpha_composite(img)
+            img = background
+        img = ImageOps.fit(img.convert("RGB"), (size, size), Image.Resampling.LANCZOS)
+
+        tmp_path = thumb_path.with_suffix(f".{os.getpid()}.tmp")
+        img.save(tmp_path, "JPEG", quality=85, optimize=True)
+        os.replace(tmp_path, thumb_path)
+
+    return thumb_path
+
+
+def get_thumbnail_path(image_path, size=None):
+    image_path = resolve_image_path(image_path)
+    if image_path is None:
+        return None
+    try:
+        return create_thumbnail(image_path, size)
+    except OSError as e:
+        logger.warning("Erro ao gerar miniatura de %s: %s", image_path, e)
+        return None
+
+
+# LRU de PhotoImage limitado pelo tamanho em memória (largura x altura x 4
+# bytes). PhotoImage só pode ser criado e usado na thread do Tk.
+class ImageCache:
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = get_setting("image_cache_mb") * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._lock = threading.Lock()
+        self._images = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is None:
+                return None
+            self._images.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, photo):
+        cost = photo.width() * photo.height() * 4
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old is not None:
+                self.size_bytes -= old[1]
+            self._images[key] = (photo, cost)
+            self.size_bytes += cost
+
+            # Quem ainda exibe uma imagem removida mantém a própria referência
+            while self.size_bytes > self.max_bytes and len(self._images) > 1:
+                _, (_, evicted_cost) = self._images.popitem(last=False)
+                self.size_bytes -= evicted_cost
+
+    def discard(self, image_path):
+        with self._lock:
+            for key in [key for key in self._images if key[0] == str(image_path)]:
+                self.size_bytes -= self._images.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.size_bytes = 0
+
+    def __len__(self):
+        return len(self._images)
+
+
+_image_cache = None
+
+
+def get_image_cache():
+    global _image_cache
+    if _image_cache is None:
+        _image_cache = ImageCache()
+    return _image_cache
+
+
+def thumbnail_key(image_path, size):
+    return (str(image_path), size)
+
+
+# As funções decode_* rodam fora da thread do Tk e devolvem uma imagem PIL
+# já carregada; o PhotoImage é criado depois, na thread principal.
+def decode_thumbnail(image_path, size):
+    from PIL import Image
+
+    thumb_path = get_thumbnail_path(image_path, size)
+    if thumb_path is None:
+        raise FileNotFoundError(f"Imagem não encontrada: {image_path}")
+    with Image.open(thumb_path) as img:
+        img.load()
+        return img.copy()
+
+
+def decode_resized(image_path, size):
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        img.draft("RGB", (size[0] * 2, size[1] * 2))
+        return img.resize(size, Image.Resampling.LANCZOS)
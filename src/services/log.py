@@ -0,0 +1,13 @@
+import logging
+
+
+# Erros de tarefas em segundo plano, que não têm janela onde mostrar uma
+# messagebox, vão todos para este logger. main.py configura a saída.
+logger = logging.getLogger("urbanfood")
+
+
+def configure_logging(level=logging.INFO):
+    logging.basicConfig(
+        level=level,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
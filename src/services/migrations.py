@@ -0,0 +1,334 @@
+import sqlite3
+
+
+class MigrationError(Exception):
+    pass
+
+
+def _create_search_index(cursor):
+    # Algumas builds do SQLite vêm sem FTS5; nesse caso a busca usa LIKE
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                name, description,
+                content='products', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e):
+            return
+        raise
+
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS stores_fts USING fts5(
+            name, description,
+            content='stores', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+
+    for table in ("products", "stores"):
+        fts = f"{table}_fts"
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, name, description) VALUES (new.id, new.name, new.description);
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name, description ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+                INSERT INTO {fts}(rowid, name, description) VALUES (new.id, new.name, new.description);
+            END
+        """)
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _create_asset_store(cursor):
+    # Só o esquema: copiar as imagens antigas para o armazenamento mexe em
+    # arquivos da instalação e fica no comando "asset_store import"
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS assets (
+            key TEXT PRIMARY KEY,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    cursor.execute("""
+        INSERT INTO assets (key, refcount)
+        SELECT image_path, COUNT(*) FROM (
+            SELECT image_path FROM products WHERE image_path IS NOT NULL
+            UNION ALL
+            SELECT image_path FROM stores WHERE image_path IS NOT NULL
+        )
+        GROUP BY image_path
+    """)
+
+    for table in ("products", "stores"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_assets_ai AFTER INSERT ON {table}
+            WHEN new.image_path IS NOT NULL BEGIN
+                INSERT INTO assets (key, refcount) VALUES (new.image_path, 1)
+                    ON CONFLICT(key) DO UPDATE SET refcount = refcount + 1;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_assets_ad AFTER DELETE ON {table}
+            WHEN old.image_path IS NOT NULL BEGIN
+                UPDATE assets SET refcount = refcount - 1 WHERE key = old.image_path;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_assets_au AFTER UPDATE OF image_path ON {table}
+            WHEN old.image_path IS NOT new.image_path BEGIN
+                UPDATE assets SET refcount = refcount - 1 WHERE key = old.image_path;
+                INSERT INTO assets (key, refcount) SELECT new.image_path, 1 WHERE new.image_path IS NOT NULL
+                    ON CONFLICT(key) DO UPDATE SET refcount = refcount + 1;
+            END
+        """)
+
+
+def _create_change_events(cursor):
+    # Diário de alterações lido pelo EventBus de cada processo. Os triggers
+    # gravam o evento na mesma transação da alteração, então qualquer
+    # terminal (ou script) que escreva no banco publica sem código extra.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            entity_id INTEGER NOT NULL,
+            store_id INTEGER,
+            client_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS orders_events_ai AFTER INSERT ON orders BEGIN
+            INSERT INTO change_events (kind, entity_id, store_id, client_id)
+            VALUES ('order_placed', new.id, new.store_id, new.client_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS orders_events_au AFTER UPDATE OF status ON orders
+        WHEN old.status IS NOT new.status BEGIN
+            INSERT INTO change_events (kind, entity_id, store_id, client_id)
+            VALUES ('order_status', new.id, new.store_id, new.client_id);
+        END
+    """)
+
+    for table, kind, store_column in (("products", "product_updated", "store_id"), ("stores", "store_edited", "id")):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_events_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO change_events (kind, entity_id, store_id) VALUES ('{kind}', new.id, new.{store_column});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_events_au AFTER UPDATE ON {table} BEGIN
+                INSERT INTO change_events (kind, entity_id, store_id) VALUES ('{kind}', new.id, new.{store_column});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_events_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO change_events (kind, entity_id, store_id) VALUES ('{kind}', old.id, old.{store_column});
+            END
+        """)
+
+
+# Cada migração é (versão, nome, passos). Um passo é um comando SQL ou uma
+# função que recebe o cursor. As versões são aplicadas em ordem crescente,
+# cada uma dentro da sua própria transação.
+MIGRATIONS = [
+    (1, "tabelas iniciais", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            user_type TEXT NOT NULL CHECK(user_type IN ('client', 'store', 'admin')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active INTEGER DEFAULT 1,
+            is_blocked INTEGER DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS stores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            image_path TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            store_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            price REAL NOT NULL,
+            image_path TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_available INTEGER DEFAULT 1,
+            FOREIGN KEY (store_id) REFERENCES stores(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER NOT NULL,
+            store_id INTEGER NOT NULL,
+            total_amount REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'Pendente'
+                CHECK(status IN ('Pendente', 'Em preparo', 'Pronto', 'Entregue', 'Cancelado')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (client_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (store_id) REFERENCES stores(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 1,
+            price REAL NOT NULL,
+            FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
+            FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+        )
+        """,
+    ]),
+    (2, "índices das consultas principais", [
+        "CREATE INDEX IF NOT EXISTS idx_products_store_available_name ON products(store_id, is_available, name)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_client_created ON orders(client_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_store_created ON orders(store_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)",
+        "CREATE INDEX IF NOT EXISTS idx_users_type_created ON users(user_type, created_at)",
+    ]),
+    (3, "busca textual de lojas e produtos (FTS5)", [
+        _create_search_index,
+    ]),
+    (4, "armazenamento de imagens por conteúdo", [
+        _create_asset_store,
+    ]),
+    (5, "carrinho persistente por usuário", [
+        """
+        CREATE TABLE IF NOT EXISTS cart_items (
+            user_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            product_name TEXT NOT NULL,
+            price REAL NOT NULL,
+            store_id INTEGER NOT NULL,
+            store_name TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, product_id),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """,
+    ]),
+    (6, "pedidos novos por loja", [
+        "CREATE INDEX IF NOT EXISTS idx_orders_store_id ON orders(store_id, id)",
+    ]),
+    (7, "acompanhamento de pedidos do cliente", [
+        "CREATE INDEX IF NOT EXISTS idx_orders_client_updated ON orders(client_id, updated_at)",
+    ]),
+    (8, "diário de alterações entre terminais", [
+        _create_change_events,
+    ]),
+    (9, "produtos da loja por data de cadastro", [
+        "CREATE INDEX IF NOT EXISTS idx_products_store_created ON products(store_id, created_at)",
+    ]),
+    (10, "limpeza do diário de alterações", [
+        "CREATE INDEX IF NOT EXISTS idx_change_events_created ON change_events(created_at)",
+    ]),
+]
+
+
+def _ensure_version_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+def get_schema_version(conn):
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def _apply(conn, version, name, steps):
+    cursor = conn.cursor()
+
+    # BEGIN explícito: o sqlite3 do Python não abre transação para DDL sozinho
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Outro terminal pode ter aplicado a versão entre a leitura em
+        # migrate() e o lock de escrita
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        if (cursor.fetchone()[0] or 0) >= version:
+            conn.rollback()
+            return False
+
+        for step in steps:
+            if callable(step):
+                step(cursor)
+            else:
+                cursor.execute(step)
+        cursor.execute(
+            "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+            (version, name)
+        )
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        conn.rollback()
+        raise MigrationError(f"Falha na migração {version} ({name}): {e}") from e
+    except Exception:
+        # Passos em Python podem falhar sem erro do SQLite; a transação não
+        # pode ficar aberta na conexão compartilhada
+        conn.rollback()
+        raise
+
+
+def migrate(conn, migrations=None, target=None):
+    if migrations is None:
+        migrations = MIGRATIONS
+
+    current = get_schema_version(conn)
+    applied = []
+
+    for version, name, steps in sorted(migrations, key=lambda m: m[0]):
+        if version <= current:
+            continue
+        if target is not None and version > target:
+            break
+        if _apply(conn, version, name, steps):
+            applied.append(version)
+
+    return applied
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    from src.services.database import Database
+
+    db = Database(os.path.abspath(sys.argv[1])) if len(sys.argv) > 1 else Database()
+    print(f"Versão do esquema: {get_schema_version(db.get_connection())}")
+    db.close()
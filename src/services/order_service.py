@@ -0,0 +1,178 @@
+from collections import namedtuple
+from src.services.config import get_setting
+from src.services.checkout_service import place_orders
+
+
+ORDER_STATUSES = ['Pendente', 'Em preparo', 'Pronto', 'Entregue', 'Cancelado']
+# Pedidos nesses status ainda podem mudar; os demais são finais
+ACTIVE_STATUSES = ('Pendente', 'Em preparo', 'Pronto')
+
+Order = namedtuple("Order", [
+    "id", "client_id", "client_name", "store_id", "store_name",
+    "total_amount", "status", "created_at", "updated_at",
+])
+
+OrderStatus = namedtuple("OrderStatus", ["id", "status", "updated_at"])
+
+OrderItem = namedtuple("OrderItem", ["order_id", "product_id", "product_name", "quantity", "price"])
+
+# entries: lista de (Order, [OrderItem]); next_key: chave para pedir a próxima página
+OrderPage = namedtuple("OrderPage", ["entries", "has_more", "next_key"])
+
+
+class OrderError(Exception):
+    pass
+
+
+# Limite seguro de parâmetros por consulta (SQLITE_MAX_VARIABLE_NUMBER antigo é 999)
+ORDER_ITEMS_CHUNK = 500
+
+ORDER_COLUMNS = """
+    o.id, o.client_id, u.name as client_name, o.store_id, s.name as store_name,
+    o.total_amount, o.status, o.created_at, o.updated_at
+"""
+
+
+def order_list_sql(owner_column, keyset=False):
+    # Paginação por chave (created_at, id): custo proporcional à página
+    return f"""
+        SELECT {ORDER_COLUMNS}
+        FROM orders o
+        INNER JOIN users u ON o.client_id = u.id
+        INNER JOIN stores s ON o.store_id = s.id
+        WHERE o.{owner_column} = ? {"AND (o.created_at, o.id) < (?, ?)" if keyset else ""}
+        ORDER BY o.created_at DESC, o.id DESC
+        LIMIT ?
+    """
+
+
+def order_feed_sql(owner_column):
+    # Pedidos criados depois do último id conhecido (marca d'água)
+    return f"""
+        SELECT {ORDER_COLUMNS}
+        FROM orders o
+        INNER JOIN users u ON o.client_id = u.id
+        INNER JOIN stores s ON o.store_id = s.id
+        WHERE o.{owner_column} = ? AND o.id > ?
+        ORDER BY o.id
+    """
+
+
+def order_changes_sql(owner_column):
+    # ">=": updated_at tem resolução de segundos, então o segundo da marca
+    # d'água é lido de novo e quem chama descarta o que já conhece
+    return f"""
+        SELECT o.id, o.status, o.updated_at
+        FROM orders o
+        WHERE o.{owner_column} = ? AND o.updated_at >= ?
+        ORDER BY o.updated_at, o.id
+    """
+
+
+def order_items_sql(count):
+    return f"""
+        SELECT oi.order_id, oi.product_id, p.name as product_name, oi.quantity, oi.price
+        FROM order_items oi
+        INNER JOIN products p ON oi.product_id = p.id
+        WHERE oi.order_id IN ({", ".join("?" * count)})
+        ORDER BY oi.order_id, oi.id
+    """
+
+
+# Todas as operações de pedidos, sem dependência do Tk. Os métodos recebem a
+# conexão de quem chama (executor em segundo plano, pool ou script).
+class OrderService:
+
+    def __init__(self, page_size=None):
+        self.page_size = page_size or get_setting("orders_page_size")
+
+    def place(self, conn, client_id, stores):
+        return place_orders(conn, client_id, stores)
+
+    def list_by_client(self, conn, client_id, after=None, limit=None):
+        return self._list(conn, "client_id", client_id, after, limit)
+
+    def list_by_store(self, conn, store_id, after=None, limit=None):
+        return self._list(conn, "store_id", store_id, after, limit)
+
+    def list_new_by_store(self, conn, store_id, after_id):
+        cursor = conn.cursor()
+        cursor.execute(order_feed_sql("store_id"), (store_id, after_id))
+        orders = [Order(*row) for row in cursor.fetchall()]
+        items_by_order = self.get_items(conn, [order.id for order in orders])
+        return [(order, items_by_order.get(order.id, [])) for order in orders]
+
+    def list_changes_by_client(self, conn, client_id, since):
+        cursor = conn.cursor()
+        cursor.execute(order_changes_sql("client_id"), (client_id, since))
+        return [OrderStatus(*row) for row in cursor.fetchall()]
+
+    def get_items(self, conn, order_ids):
+        items_by_order = {}
+        order_ids = list(order_ids)
+        cursor = conn.cursor()
+
+        for start in range(0, len(order_ids), ORDER_ITEMS_CHUNK):
+            chunk = order_ids[start:start + ORDER_ITEMS_CHUNK]
+            cursor.execute(order_items_sql(len(chunk)), chunk)
+            for row in cursor.fetchall():
+                items_by_order.setdefault(row[0], []).append(OrderItem(*row))
+
+        return items_by_order
+
+    def update_status(self, conn, store_id, order_id, status):
+        if status not in ORDER_STATUSES:
+            raise OrderError(f"Status inválido: {status}")
+
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE orders
+            SET status = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND store_id = ?
+        """, (status, order_id, store_id))
+        conn.commit()
+
+        if cursor.rowcount == 0:
+            raise OrderError(f"Pedido #{order_id} não encontrado.")
+        return self.get_order(conn, order_id)
+
+    def get_order(self, conn, order_id):
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {ORDER_COLUMNS}
+            FROM orders o
+            INNER JOIN users u ON o.client_id = u.id
+            INNER JOIN stores s ON o.store_id = s.id
+            WHERE o.id = ?
+        """, (order_id,))
+        row = cursor.fetchone()
+        return Order(*row) if row else None
+
+    def _list(self, conn, owner_column, owner_id, after, limit):
+        limit = limit or self.page_size
+        params = [owner_id]
+        if after:
+            params.extend(after)
+        params.append(limit + 1)
+
+        cursor = conn.cursor()
+        cursor.execute(order_list_sql(owner_column, keyset=bool(after)), params)
+        orders = [Order(*row) for row in cursor.fetchall()]
+
+        has_more = len(orders) > limit
+        orders = orders[:limit]
+        items_by_order = self.get_items(conn, [order.id for order in orders])
+
+        entries = [(order, items_by_order.get(order.id, [])) for order in orders]
+        next_key = (orders[-1].created_at, orders[-1].id) if orders else after
+        return OrderPage(entries, has_more, next_key)
+
+
+_order_service = None
+
+
+def get_order_service():
+    global _order_service
+    if _order_service is None:
+        _order_service = OrderService()
+    return _order_service
@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.services.database import get_db
+from src.services.config import get_setting
+from src.services.log import logger
+
+
+class _Job:
+
+    def __init__(self, query, readonly):
+        self.query = query
+        self.readonly = readonly
+        self.future = None
+        self.conn = None
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+
+
+# Executa consultas fora da thread do Tk e entrega o resultado via after().
+# submit() e cancel() devem ser chamados da thread principal. Cada chave
+# (widget, nome) tem no máximo uma consulta pendente: uma nova chamada com a
+# mesma chave cancela a anterior.
+class QueryExecutor:
+
+    def __init__(self, max_workers=4, poll_interval=25):
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="urbanfood-query")
+        self._pending = {}
+
+    def _run(self, job):
+        if job.cancelled.is_set():
+            return None
+
+        with get_db().connection(readonly=job.readonly) as conn:
+            with job.lock:
+                job.conn = conn
+            try:
+                return job.query(conn)
+            finally:
+                with job.lock:
+                    job.conn = None
+
+    def submit(self, widget, name, query, on_success, on_error=None, readonly=True):
+        key = (str(widget), name)
+        self._cancel_key(key)
+
+        job = _Job(query, readonly)
+        job.future = self._executor.submit(self._run, job)
+        self._pending[key] = job
+        widget.after(self.poll_interval, lambda: self._poll(widget, key, job, on_success, on_error))
+        return job.future
+
+    # Para gravações que não podem ser interrompidas (checkout): sem chave, sem
+    # cancelamento, e o resultado é entregue pela janela principal mesmo que
+    # o widget de origem já tenha sido fechado
+    def run(self, widget, name, query, on_success, on_error=None, readonly=False):
+        root = widget.nametowidget(".")
+        job = _Job(query, readonly)
+        job.future = self._executor.submit(self._run, job)
+        root.after(self.poll_interval, lambda: self._poll_detached(root, name, job, on_success, on_error))
+        return job.future
+
+    def _poll_detached(self, root, name, job, on_success, on_error):
+        if not job.future.done():
+            root.after(self.poll_interval, lambda: self._poll_detached(root, name, job, on_success, on_error))
+            return
+        self._deliver(name, job, on_success, on_error)
+
+    def _deliver(self, name, job, on_success, on_error):
+        error = job.future.exception()
+        if error is None:
+            on_success(job.future.result())
+        elif on_error:
+            on_error(error)
+        else:
+            logger.error("Erro na consulta em segundo plano (%s)", name, exc_info=error)
+
+    def _poll(self, widget, key, job, on_success, on_error):
+        if self._pending.get(key) is not job:
+            return
+
+        try:
+            alive = widget.winfo_exists()
+        except Exception:
+            alive = False
+        if not alive:
+            self._cancel_key(key)
+            return
+
+        if not job.future.done():
+            widget.after(self.poll_interval, lambda: self._poll(widget, key, job, on_success, on_error))
+            return
+
+        del self._pending[key]
+        self._deliver(key[1], job, on_success, on_error)
+
+    def _cancel_key(self, key):
+        job = self._pending.pop(key, None)
+        if job is None:
+            return
+
+        job.cancelled.set()
+        job.future.cancel()
+        with job.lock:
+            if job.conn is not None:
+                job.conn.interrupt()
+
+    def cancel(self, widget, name=None):
+        prefix = str(widget)
+        for key in list(self._pending):
+            if name is not None:
+                if key == (prefix, name):
+                    self._cancel_key(key)
+            elif key[0] == prefix or key[0].startswith(prefix + "."):
+                self._cancel_key(key)
+
+    def is_pending(self, widget, name):
+        return (str(widget), name) in self._pending
+
+    def shutdown(self):
+        for key in list(self._pending):
+            self._cancel_key(key)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_executor_instance = None
+
+
+def get_query_executor():
+    global _executor_instance
+    if _executor_instance is None:
+        _executor_instance = QueryExecutor(
+            max_workers=get_setting("query_workers"),
+            poll_interval=get_setting("query_poll_interval")
+        )
+    return _executor_instance
@@ -0,0 +1,155 @@
+import os
+import sys
+import sqlite3
+from src.services.database import Database
+from src.services.catalog_cache import catalog_sql
+from src.services.search_service import FTS_SEARCH_SQL, FTS_SHORT_SEARCH_SQL
+from src.services.event_bus import PRUNE_SQL
+from src.services.order_service import order_list_sql, order_feed_sql, order_changes_sql, order_items_sql
+from src.store.products import STORE_PRODUCTS_SQL
+from src.admin.manage_users import USERS_BY_TYPE_SQL
+
+
+# Consultas de produção que precisam usar índice, com o SQL importado de quem
+# o executa. "allow_scan" lista os aliases que podem ser percorridos inteiros
+# (ex.: a tabela externa do catálogo, resultados intermediários da busca);
+# "allow_temp_sort" aceita ordenação em B-tree temporária quando o conjunto
+# ordenado é o próprio resultado (catálogo inteiro, acertos da busca).
+HOT_QUERIES = {
+    "home.catalog": {
+        "sql": catalog_sql(),
+        "params": (),
+        "allow_scan": ("s",),
+        "allow_temp_sort": True,
+    },
+    "home.catalog.stores": {
+        "sql": catalog_sql(3),
+        "params": (1, 2, 3),
+        "allow_scan": (),
+        "allow_temp_sort": True,
+    },
+    "home.search": {
+        "sql": FTS_SEARCH_SQL,
+        "params": {"query": '"piz"*', "limit": 200, "store_limit": 10},
+        "allow_scan": ("h", "hits", "ranked", "r", "product_hits", "store_hits"),
+        "allow_temp_sort": True,
+    },
+    "home.search.short": {
+        "sql": FTS_SHORT_SEARCH_SQL,
+        "params": {"query": '"p"*', "limit": 200, "store_limit": 10},
+        "allow_scan": ("h", "hits", "ranked", "r", "product_hits", "store_hits"),
+        "allow_temp_sort": True,
+    },
+    "client.orders": {
+        "sql": order_list_sql("client_id"),
+        "params": (1, 21),
+        "allow_scan": (),
+    },
+    "client.orders.next": {
+        "sql": order_list_sql("client_id", keyset=True),
+        "params": (1, "2025-01-01 00:00:00", 1, 21),
+        "allow_scan": (),
+    },
+    "client.orders.tracking": {
+        "sql": order_changes_sql("client_id"),
+        "params": (1, "2025-01-01 00:00:00"),
+        "allow_scan": (),
+    },
+    "store.orders": {
+        "sql": order_list_sql("store_id"),
+        "params": (1, 21),
+        "allow_scan": (),
+    },
+    "store.orders.next": {
+        "sql": order_list_sql("store_id", keyset=True),
+        "params": (1, "2025-01-01 00:00:00", 1, 21),
+        "allow_scan": (),
+    },
+    "store.orders.feed": {
+        "sql": order_feed_sql("store_id"),
+        "params": (1, 0),
+        "allow_scan": (),
+    },
+    "orders.items": {
+        "sql": order_items_sql(3),
+        "params": (1, 2, 3),
+        "allow_scan": (),
+    },
+    "store.products": {
+        "sql": STORE_PRODUCTS_SQL,
+        "params": (1,),
+        "allow_scan": (),
+    },
+    "events.prune": {
+        "sql": PRUNE_SQL,
+        "params": ("-24 hours",),
+        "allow_scan": (),
+    },
+    "admin.users_by_type": {
+        "sql": USERS_BY_TYPE_SQL,
+        "params": ("client",),
+        "allow_scan": (),
+    },
+}
+
+
+def explain(conn, sql, params=()):
+    cursor = conn.cursor()
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    return [row[3] for row in cursor.fetchall()]
+
+
+def _plan_problems(plan, allow_scan, allow_temp_sort=False):
+    problems = []
+    for detail in plan:
+        if detail.startswith("USE TEMP B-TREE"):
+            if not allow_temp_sort:
+                problems.append(detail)
+            continue
+        if not detail.startswith("SCAN "):
+            continue
+        if "USING INDEX" in detail or "USING COVERING INDEX" in detail or "VIRTUAL TABLE INDEX" in detail:
+            continue
+        alias = detail.split()[1]
+        if alias not in allow_scan:
+            problems.append(detail)
+    return problems
+
+
+def check_query_plans(conn, queries=None):
+    if queries is None:
+        queries = HOT_QUERIES
+
+    failures = {}
+    for name, query in queries.items():
+        plan = explain(conn, query["sql"], query["params"])
+        problems = _plan_problems(plan, query["allow_scan"], query.get("allow_temp_sort", False))
+        if problems:
+            failures[name] = problems
+    return failures
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    db = Database(os.path.abspath(argv[0])) if argv else Database()
+    conn = db.get_connection()
+
+    try:
+        failures = check_query_plans(conn)
+    except sqlite3.Error as e:
+        print(f"Erro ao analisar consultas: {e}")
+        return 2
+    finally:
+        db.close()
+
+    for name in HOT_QUERIES:
+        status = "FALHOU" if name in failures else "ok"
+        print(f"{status:6} {name}")
+        for detail in failures.get(name, []):
+            print(f"       {detail}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
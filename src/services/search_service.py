@@ -0,0 +1,162 @@
+import re
+import unicodedata
+from collections import namedtuple
+from src.services.config import get_setting
+
+
+# complete=True quando nenhum limite cortou o resultado: assim ele pode ser
+# refinado em memória quando o usuário continua digitando a mesma busca.
+SearchResult = namedtuple("SearchResult", ["term", "rows", "complete", "fts"])
+
+
+CATALOG_COLUMNS = """
+    s.id as store_id, s.name as store_name, s.description as store_description,
+    p.id as product_id, p.name as product_name, p.description as product_description,
+    p.price, p.image_path as product_image
+"""
+
+# bm25 com peso maior para o nome do que para a descrição. Com ranked=False
+# (termos de uma letra, que casam com boa parte do catálogo) os acertos vêm
+# sem ordenação por bm25 e as lojas encontradas sem o cardápio inteiro:
+# ordenar todos os acertos e expandir os cardápios custava dezenas de ms.
+def fts_search_sql(ranked=True):
+    product_rank = "bm25(products_fts, 10.0, 1.0)" if ranked else "0"
+    store_rank = "bm25(stores_fts, 10.0, 1.0)" if ranked else "0"
+    order = "ORDER BY rank " if ranked else ""
+    store_menus = """
+        SELECT p.store_id, p.id, h.rank
+        FROM store_hits h
+        INNER JOIN products p ON p.store_id = h.id AND p.is_available = 1
+        UNION ALL""" if ranked else ""
+    return f"""
+    WITH product_hits AS (
+        SELECT rowid AS id, {product_rank} AS rank
+        FROM products_fts WHERE products_fts MATCH :query
+        {order}LIMIT :limit
+    ),
+    store_hits AS (
+        SELECT rowid AS id, {store_rank} AS rank
+        FROM stores_fts WHERE stores_fts MATCH :query
+        {order}LIMIT :store_limit
+    ),
+    hits AS (
+        SELECT p.store_id, p.id AS product_id, h.rank
+        FROM product_hits h
+        INNER JOIN products p ON p.id = h.id AND p.is_available = 1
+        UNION ALL{store_menus}
+        SELECT h.id, NULL, h.rank
+        FROM store_hits h
+    ),
+    ranked AS (
+        SELECT store_id, product_id, MIN(rank) AS rank
+        FROM hits
+        GROUP BY store_id, product_id
+    ),
+    store_rank AS (
+        SELECT store_id, MIN(rank) AS rank, COUNT(product_id) AS products
+        FROM ranked
+        GROUP BY store_id
+    )
+    SELECT {CATALOG_COLUMNS},
+        (SELECT COUNT(*) FROM product_hits) AS product_hit_count,
+        (SELECT COUNT(*) FROM store_hits) AS store_hit_count
+    FROM ranked r
+    INNER JOIN store_rank sr ON sr.store_id = r.store_id
+    INNER JOIN stores s ON s.id = r.store_id
+    LEFT JOIN products p ON p.id = r.product_id
+    WHERE r.product_id IS NOT NULL OR sr.products = 0
+    ORDER BY sr.rank, s.id, r.rank, p.name
+    LIMIT :limit
+"""
+
+
+FTS_SEARCH_SQL = fts_search_sql()
+FTS_SHORT_SEARCH_SQL = fts_search_sql(ranked=False)
+
+LIKE_SEARCH_SQL = f"""
+    SELECT {CATALOG_COLUMNS}
+    FROM stores s
+    LEFT JOIN products p ON s.id = p.store_id AND p.is_available = 1
+    WHERE s.name LIKE ? OR p.name LIKE ?
+    ORDER BY s.name, p.name
+    LIMIT ?
+"""
+
+
+def _tokenize(text):
+    # Mesmo critério do tokenizer unicode61 com remove_diacritics
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.findall(r"\w+", text)
+
+
+def build_match_query(search_term):
+    # Cada palavra vira um prefixo entre aspas: "ham"* "bur"* (todas obrigatórias)
+    tokens = _tokenize(search_term)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _matches_all(tokens, *texts):
+    words = []
+    for text in texts:
+        if text:
+            words.extend(_tokenize(text))
+    return all(any(word.startswith(token) for word in words) for token in tokens)
+
+
+def filter_catalog(result, search_term):
+    if result.fts:
+        tokens = _tokenize(search_term)
+        rows = [
+            row for row in result.rows
+            if _matches_all(tokens, row['store_name'], row['store_description'])
+            or (row['product_id'] and _matches_all(tokens, row['product_name'], row['product_description']))
+        ]
+    else:
+        term = search_term.lower()
+        rows = [
+            row for row in result.rows
+            if term in row['store_name'].lower()
+            or (row['product_name'] and term in row['product_name'].lower())
+        ]
+    return SearchResult(search_term, rows, result.complete, result.fts)
+
+
+def can_refine(result, search_term):
+    return result is not None and result.complete and search_term.startswith(result.term)
+
+
+def has_search_index(conn):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+    ).fetchone()
+    return row is not None
+
+
+def search_catalog(conn, search_term, limit=None):
+    if limit is None:
+        limit = get_setting("search_limit")
+    store_limit = max(1, limit // 20)
+    cursor = conn.cursor()
+
+    if not has_search_index(conn):
+        cursor.execute(LIKE_SEARCH_SQL, (f"%{search_term}%", f"%{search_term}%", limit))
+        rows = cursor.fetchall()
+        return SearchResult(search_term, rows, len(rows) < limit, False)
+
+    match_query = build_match_query(search_term)
+    if not match_query:
+        return SearchResult(search_term, [], True, True)
+
+    short = all(len(token) == 1 for token in _tokenize(search_term))
+    sql = FTS_SHORT_SEARCH_SQL if short else FTS_SEARCH_SQL
+    cursor.execute(sql, {"query": match_query, "limit": limit, "store_limit": store_limit})
+    rows = cursor.fetchall()
+    # Completo se nenhum dos LIMITs cortou acertos: os de produtos e lojas no
+    # FTS (contados antes de filtrar indisponíveis) e o do resultado final.
+    # A busca curta não traz o cardápio das lojas, então não serve para refinar.
+    complete = not short and len(rows) < limit
+    if rows:
+        complete = complete and rows[0]['product_hit_count'] < limit \
+            and rows[0]['store_hit_count'] < store_limit
+    return SearchResult(search_term, rows, complete, True)
@@ -1,4 +1,5 @@
 import tkinter as tk
+from src.services.query_executor import get_query_executor
 from src.store.orders import StoreOrdersPage
 from src.store.products import StoreProductsPage
 
@@ -69,6 +70,8 @@ class StoreDashboard:
         }
     
     def _clear_content(self):
+        # Cancela consultas da página anterior que ainda não terminaram
+        get_query_executor().cancel(self.content_frame)
         if self.current_page:
             try:
                 if hasattr(self.current_page, 'window') and self.current_page.window.winfo_exists():
@@ -104,6 +107,7 @@ class StoreDashboard:
         self.current_page = StoreProductsPage(self.content_frame, self.user_data, self.store_data, self)
     
     def _on_close(self):
+        get_query_executor().cancel(self.content_frame)
         self.window.destroy()
         if self.parent.winfo_exists():
             from src.auth.login import LoginWindow
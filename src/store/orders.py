@@ -1,7 +1,10 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import sqlite3
-from src.services.database import get_db
+from tkinter import messagebox
+from src.services.query_executor import get_query_executor
+from src.services.order_service import get_order_service, ORDER_STATUSES
+from src.services.event_bus import get_event_bus, ORDER_PLACED, ORDER_STATUS
+from src.services.log import logger
+from src.components.virtual_list import VirtualList
 from datetime import datetime
 
 
@@ -12,7 +15,18 @@ class StoreOrdersPage:
         self.user_data = user_data
         self.store_data = store_data
         
+        self.last_key = None
+        self.has_more = False
+        self.loading_more = False
+        
+        # Maior id de pedido já exibido; None enquanto a primeira página não chega
+        self.feed_after_id = None
+        self.pending_events = []
+        
         self._create_widgets()
+        self.orders_list.frame.bind("<Destroy>", self._on_destroy)
+        get_event_bus().subscribe(ORDER_PLACED, self._on_order_event)
+        get_event_bus().subscribe(ORDER_STATUS, self._on_order_event)
         self._load_orders()
     
     def _create_widgets(self):
@@ -29,203 +43,387 @@ class StoreOrdersPage:
         )
         title_label.pack(pady=25)
         
-        main_frame = tk.Frame(self.parent)
-        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        self.orders_list = VirtualList(
+            self.parent,
+            create_row=self._create_order_row,
+            bind_row=self._bind_order_row,
+            row_height=self._order_row_height,
+            row_kind=lambda item: item[0],
+            item_key=self._item_key,
+            on_reach_end=self._load_more_orders
+        )
+        self.orders_list.pack(fill="both", expand=True, padx=20, pady=20)
+    
+    def _load_orders(self):
+        self.last_key = None
+        self.has_more = False
+        self.loading_more = False
+        self.feed_after_id = None
         
-        canvas = tk.Canvas(main_frame, bg="white")
-        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg="white")
+        self.orders_list.set_items([])
+        self.orders_list.show_message("Carregando...")
         
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        get_query_executor().submit(
+            self.parent,
+            "store.orders",
+            lambda conn: get_order_service().list_by_store(conn, self.store_data['id']),
+            lambda page: self._render_orders(page, replace=True),
+            lambda e: messagebox.showerror("Erro", f"Erro ao carregar pedidos: {str(e)}")
         )
+    
+    def _load_more_orders(self):
+        if not self.has_more or self.loading_more:
+            return
+        
+        self.loading_more = True
+        after = self.last_key
+        get_query_executor().submit(
+            self.parent,
+            "store.orders",
+            lambda conn: get_order_service().list_by_store(conn, self.store_data['id'], after),
+            lambda page: self._render_orders(page, replace=False),
+            self._on_load_more_error
+        )
+    
+    def _on_load_more_error(self, error):
+        self.loading_more = False
+        messagebox.showerror("Erro", f"Erro ao carregar pedidos: {str(error)}")
+    
+    def _render_orders(self, page, replace):
+        self.loading_more = False
+        self.has_more = page.has_more
+        self.last_key = page.next_key
         
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        if replace:
+            self.feed_after_id = 0
+            self.orders_list.set_items([])
+            if not page.entries:
+                self.orders_list.show_message("Nenhum pedido recebido ainda.")
         
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self._insert_orders(page.entries)
+        for entry in page.entries:
+            self.feed_after_id = max(self.feed_after_id, entry[0].id)
         
-        self.orders_frame = scrollable_frame
+        if replace:
+            # Eventos que chegaram durante a carga da primeira página
+            pending, self.pending_events = self.pending_events, []
+            for event in pending:
+                self._on_order_event(event)
     
-    def _load_orders(self):
-        for widget in self.orders_frame.winfo_children():
-            widget.destroy()
+    # Pedidos de outros terminais chegam pelo barramento de eventos: pedido
+    # novo busca só os pedidos com id acima da marca; mudança de status
+    # relê apenas o pedido afetado, se ele estiver na lista.
+    
+    def _on_order_event(self, event):
+        if event.store_id != self.store_data['id']:
+            return
+        if self.feed_after_id is None:
+            self.pending_events.append(event)
+            return
         
-        db = get_db()
-        conn = db.get_connection()
-        cursor = conn.cursor()
+        if event.kind == ORDER_PLACED:
+            if event.entity_id > self.feed_after_id:
+                self._fetch_new_orders()
+        elif self.orders_list.index_of(("order", event.entity_id)) is not None:
+            self._refresh_order(event.entity_id)
+    
+    def _fetch_new_orders(self):
+        store_id = self.store_data['id']
+        after_id = self.feed_after_id
+        get_query_executor().submit(
+            self.orders_list.frame,
+            "store.orders.feed",
+            lambda conn: get_order_service().list_new_by_store(conn, store_id, after_id),
+            self._on_new_orders,
+            lambda e: logger.error("Erro ao buscar pedidos novos", exc_info=e)
+        )
+    
+    def _refresh_order(self, order_id):
+        get_query_executor().submit(
+            self.orders_list.frame,
+            f"store.orders.refresh.{order_id}",
+            lambda conn: get_order_service().get_order(conn, order_id),
+            self._on_order_refreshed,
+            lambda e: logger.error("Erro ao atualizar pedido #%s", order_id, exc_info=e)
+        )
+    
+    def _on_order_refreshed(self, order):
+        if order is None:
+            return
+        index = self.orders_list.index_of(("order", order.id))
+        if index is None:
+            return
         
-        try:
-            cursor.execute("""
-                SELECT o.id, o.total_amount, o.status, o.created_at, o.updated_at,
-                       u.name as client_name, u.id as client_id
-                FROM orders o
-                INNER JOIN users u ON o.client_id = u.id
-                WHERE o.store_id = ?
-                ORDER BY o.created_at DESC
-            """, (self.store_data['id'],))
+        current, items = self.orders_list.items[index][1]
+        if current.status == order.status:
+            return
+        self._remove_order(order.id)
+        self._insert_orders([(order, items)])
+    
+    def _on_new_orders(self, entries):
+        if entries and not self.orders_list.items:
+            self.orders_list.show_message("")
+        
+        new_entries = []
+        for entry in entries:
+            self.feed_after_id = max(self.feed_after_id, entry[0].id)
+            if self.orders_list.index_of(("order", entry[0].id)) is None:
+                new_entries.append(entry)
+        self._insert_orders(new_entries)
+        
+        if entries:
+            self.orders_list.frame.bell()
+    
+    def _on_destroy(self, event):
+        if event.widget is self.orders_list.frame:
+            get_event_bus().unsubscribe(ORDER_PLACED, self._on_order_event)
+            get_event_bus().unsubscribe(ORDER_STATUS, self._on_order_event)
+    
+    # A lista é dividida em seções por status, na ordem de ORDER_STATUSES:
+    # ("header", status) seguido de ("order", (pedido, itens)), mais novos primeiro.
+    # Mudanças de status movem só o card afetado, sem consultar a lista de novo.
+    
+    def _item_key(self, item):
+        kind, data = item
+        if kind == "header":
+            return ("header", data)
+        return ("order", data[0].id)
+    
+    def _sort_key(self, entry):
+        return (entry[0].created_at, entry[0].id)
+    
+    def _section_end(self, status):
+        # Início da primeira seção de status posterior (ou o fim da lista)
+        rank = ORDER_STATUSES.index(status)
+        for later in ORDER_STATUSES[rank + 1:]:
+            index = self.orders_list.index_of(("header", later))
+            if index is not None:
+                return index
+        return len(self.orders_list.items)
+    
+    def _insert_orders(self, entries):
+        # Os pedidos são agrupados por seção, e cada grupo entra na lista em
+        # blocos contíguos: uma página inteira costuma ser um insert por seção
+        sections = {}
+        for entry in entries:
+            sections.setdefault(entry[0].status, []).append(entry)
+        
+        for status, group in sections.items():
+            group.sort(key=self._sort_key, reverse=True)
+            header_index = self.orders_list.index_of(("header", status))
+            end = self._section_end(status)
             
-            orders = cursor.fetchall()
+            if header_index is None:
+                self.orders_list.insert_items(end, [("header", status)] + [("order", entry) for entry in group])
+                continue
             
-            if not orders:
-                no_orders_label = tk.Label(
-                    self.orders_frame,
-                    text="Nenhum pedido recebido ainda.",
-                    font=("Arial", 14),
-                    bg="white",
-                    fg="#757575"
-                )
-                no_orders_label.pack(pady=50)
-                return
+            # Posição de cada pedido na seção (mais novos primeiro); pedidos
+            # com a mesma posição formam um bloco
+            blocks = []
+            for entry in group:
+                index = self._section_position(header_index + 1, end, self._sort_key(entry))
+                if blocks and blocks[-1][0] == index:
+                    blocks[-1][1].append(("order", entry))
+                else:
+                    blocks.append((index, [("order", entry)]))
             
-            for order in orders:
-                order_frame = tk.Frame(self.orders_frame, bg="white", relief="solid", bd=2)
-                order_frame.pack(fill="x", padx=10, pady=10)
-                
-                header_order = tk.Frame(order_frame, bg="#2196F3", height=50)
-                header_order.pack(fill="x")
-                header_order.pack_propagate(False)
-                
-                order_info_top = tk.Frame(header_order, bg="#2196F3")
-                order_info_top.pack(fill="x", padx=15, pady=5)
-                
-                client_label = tk.Label(
-                    order_info_top,
-                    text=f"👤 Cliente: {order['client_name']}",
-                    font=("Arial", 16, "bold"),
-                    bg="#2196F3",
-                    fg="white"
-                )
-                client_label.pack(side="left")
-                
-                status_color = self._get_status_color(order['status'])
-                status_label = tk.Label(
-                    order_info_top,
-                    text=order['status'],
-                    font=("Arial", 12, "bold"),
-                    bg=status_color,
-                    fg="white",
-                    padx=10,
-                    pady=5
-                )
-                status_label.pack(side="right", padx=5)
-                
-                order_id_label = tk.Label(
-                    header_order,
-                    text=f"Pedido #{order['id']}",
-                    font=("Arial", 10),
-                    bg="#2196F3",
-                    fg="white"
-                )
-                order_id_label.pack(pady=2)
-                
-                content_order = tk.Frame(order_frame, bg="white")
-                content_order.pack(fill="x", padx=15, pady=10)
-                
-                cursor.execute("""
-                    SELECT oi.quantity, oi.price, p.name as product_name
-                    FROM order_items oi
-                    INNER JOIN products p ON oi.product_id = p.id
-                    WHERE oi.order_id = ?
-                """, (order['id'],))
-                
-                items = cursor.fetchall()
-                
-                items_label = tk.Label(
-                    content_order,
-                    text="Itens:",
-                    font=("Arial", 12, "bold"),
-                    bg="white",
-                    anchor="w"
-                )
-                items_label.pack(fill="x", pady=(0, 5))
-                
-                for item in items:
-                    item_text = f"  • {item['product_name']} x{item['quantity']} = R$ {item['price'] * item['quantity']:.2f}"
-                    item_label = tk.Label(
-                        content_order,
-                        text=item_text,
-                        font=("Arial", 10),
-                        bg="white",
-                        anchor="w",
-                        fg="#424242"
-                    )
-                    item_label.pack(fill="x", padx=10)
-                
-                separator = tk.Frame(content_order, bg="#e0e0e0", height=1)
-                separator.pack(fill="x", pady=10)
-                
-                bottom_info = tk.Frame(content_order, bg="white")
-                bottom_info.pack(fill="x")
-                
-                date_str = self._format_date(order['created_at'])
-                date_label = tk.Label(
-                    bottom_info,
-                    text=f"📅 {date_str}",
-                    font=("Arial", 10),
-                    bg="white",
-                    fg="#757575"
-                )
-                date_label.pack(side="left")
-                
-                total_label = tk.Label(
-                    bottom_info,
-                    text=f"Total: R$ {order['total_amount']:.2f}",
-                    font=("Arial", 14, "bold"),
-                    bg="white",
-                    fg="#4CAF50"
-                )
-                total_label.pack(side="right")
-                
-                status_frame = tk.Frame(content_order, bg="white")
-                status_frame.pack(fill="x", pady=10)
-                
-                status_label_text = tk.Label(
-                    status_frame,
-                    text="Atualizar status:",
-                    font=("Arial", 10, "bold"),
-                    bg="white"
-                )
-                status_label_text.pack(side="left", padx=5)
-                
-                status_options = ['Pendente', 'Em preparo', 'Pronto', 'Entregue', 'Cancelado']
-                current_status = order['status']
-                
-                for status in status_options:
-                    if status != current_status:
-                        status_btn = tk.Button(
-                            status_frame,
-                            text=status,
-                            font=("Arial", 9),
-                            bg="#757575",
-                            fg="white",
-                            command=lambda s=status, oid=order['id']: self._update_status(oid, s)
-                        )
-                        status_btn.pack(side="left", padx=2)
-        
-        except sqlite3.Error as e:
-            messagebox.showerror("Erro", f"Erro ao carregar pedidos: {str(e)}")
+            # Do fim para o começo, para as posições calculadas continuarem valendo
+            for index, block in reversed(blocks):
+                self.orders_list.insert_items(index, block)
     
-    def _update_status(self, order_id, new_status):
-        db = get_db()
-        conn = db.get_connection()
-        cursor = conn.cursor()
+    def _section_position(self, start, end, sort_key):
+        items = self.orders_list.items
+        while start < end:
+            middle = (start + end) // 2
+            if self._sort_key(items[middle][1]) > sort_key:
+                start = middle + 1
+            else:
+                end = middle
+        return start
+    
+    def _remove_order(self, order_id):
+        index = self.orders_list.index_of(("order", order_id))
+        if index is None:
+            return None
         
-        try:
-            cursor.execute("""
-                UPDATE orders 
-                SET status = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ? AND store_id = ?
-            """, (new_status, order_id, self.store_data['id']))
-            
-            conn.commit()
-            messagebox.showinfo("Sucesso", f"Status do pedido atualizado para: {new_status}")
-            self._load_orders()
+        entry = self.orders_list.items[index][1]
+        self.orders_list.remove_item(index)
+        
+        # Seção vazia perde o cabeçalho
+        items = self.orders_list.items
+        header_index = self.orders_list.index_of(("header", entry[0].status))
+        if header_index + 1 >= len(items) or items[header_index + 1][0] == "header":
+            self.orders_list.remove_item(header_index)
+        return entry
+    
+    def _order_row_height(self, item):
+        kind, data = item
+        if kind == "header":
+            return 50
+        order, items = data
+        return 240 + 20 * len(items)
+    
+    def _create_order_row(self, parent, kind):
+        row = tk.Frame(parent, bg="white")
+        
+        if kind == "header":
+            row.section_label = tk.Label(
+                row,
+                font=("Arial", 14, "bold"),
+                fg="white",
+                anchor="w",
+                padx=15
+            )
+            row.section_label.pack(fill="both", expand=True, padx=10, pady=(10, 0))
+            return row
+        
+        order_frame = tk.Frame(row, bg="white", relief="solid", bd=2)
+        order_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        header_order = tk.Frame(order_frame, bg="#2196F3", height=50)
+        header_order.pack(fill="x")
+        header_order.pack_propagate(False)
+        
+        order_info_top = tk.Frame(header_order, bg="#2196F3")
+        order_info_top.pack(fill="x", padx=15, pady=5)
+        
+        row.client_label = tk.Label(
+            order_info_top,
+            font=("Arial", 16, "bold"),
+            bg="#2196F3",
+            fg="white"
+        )
+        row.client_label.pack(side="left")
+        
+        row.status_label = tk.Label(
+            order_info_top,
+            font=("Arial", 12, "bold"),
+            fg="white",
+            padx=10,
+            pady=5
+        )
+        row.status_label.pack(side="right", padx=5)
+        
+        row.order_id_label = tk.Label(
+            header_order,
+            font=("Arial", 10),
+            bg="#2196F3",
+            fg="white"
+        )
+        row.order_id_label.pack(pady=2)
+        
+        content_order = tk.Frame(order_frame, bg="white")
+        content_order.pack(fill="x", padx=15, pady=10)
+        
+        items_label = tk.Label(
+            content_order,
+            text="Itens:",
+            font=("Arial", 12, "bold"),
+            bg="white",
+            anchor="w"
+        )
+        items_label.pack(fill="x", pady=(0, 5))
+        
+        row.items_text = tk.Label(
+            content_order,
+            font=("Arial", 10),
+            bg="white",
+            anchor="w",
+            justify="left",
+            fg="#424242"
+        )
+        row.items_text.pack(fill="x", padx=10)
         
-        except sqlite3.Error as e:
-            messagebox.showerror("Erro", f"Erro ao atualizar status: {str(e)}")
+        separator = tk.Frame(content_order, bg="#e0e0e0", height=1)
+        separator.pack(fill="x", pady=10)
+        
+        bottom_info = tk.Frame(content_order, bg="white")
+        bottom_info.pack(fill="x")
+        
+        row.date_label = tk.Label(
+            bottom_info,
+            font=("Arial", 10),
+            bg="white",
+            fg="#757575"
+        )
+        row.date_label.pack(side="left")
+        
+        row.total_label = tk.Label(
+            bottom_info,
+            font=("Arial", 14, "bold"),
+            bg="white",
+            fg="#4CAF50"
+        )
+        row.total_label.pack(side="right")
+        
+        status_frame = tk.Frame(content_order, bg="white")
+        status_frame.pack(fill="x", pady=10)
+        
+        status_label_text = tk.Label(
+            status_frame,
+            text="Atualizar status:",
+            font=("Arial", 10, "bold"),
+            bg="white"
+        )
+        status_label_text.pack(side="left", padx=5)
+        
+        # Um botão para cada status diferente do atual
+        row.status_buttons = []
+        for _ in range(len(ORDER_STATUSES) - 1):
+            status_btn = tk.Button(
+                status_frame,
+                font=("Arial", 9),
+                bg="#757575",
+                fg="white"
+            )
+            status_btn.pack(side="left", padx=2)
+            row.status_buttons.append(status_btn)
+        return row
+    
+    def _bind_order_row(self, row, item):
+        kind, data = item
+        if kind == "header":
+            row.section_label.config(text=data, bg=self._get_status_color(data))
+            return
+        
+        order, items = data
+        
+        row.client_label.config(text=f"👤 Cliente: {order.client_name}")
+        row.status_label.config(text=order.status, bg=self._get_status_color(order.status))
+        row.order_id_label.config(text=f"Pedido #{order.id}")
+        row.items_text.config(text="\n".join(
+            f"  • {item.product_name} x{item.quantity} = R$ {item.price * item.quantity:.2f}"
+            for item in items
+        ))
+        row.date_label.config(text=f"📅 {self._format_date(order.created_at)}")
+        row.total_label.config(text=f"Total: R$ {order.total_amount:.2f}")
+        
+        other_statuses = [status for status in ORDER_STATUSES if status != order.status]
+        for status_btn, status in zip(row.status_buttons, other_statuses):
+            status_btn.config(
+                text=status,
+                command=lambda s=status, oid=order.id: self._update_status(oid, s)
+            )
+    
+    def _update_status(self, order_id, new_status):
+        store_id = self.store_data['id']
+        # Sem cancelamento: trocar de aba ou clicar de novo não interrompe a
+        # gravação, e o resultado sempre chega
+        get_query_executor().run(
+            self.orders_list.frame,
+            "store.orders.status",
+            lambda conn: get_order_service().update_status(conn, store_id, order_id, new_status),
+            lambda order: self._on_status_updated(order, new_status),
+            lambda e: messagebox.showerror("Erro", f"Erro ao atualizar status: {str(e)}"),
+            readonly=False
+        )
+    
+    def _on_status_updated(self, order, new_status):
+        if self.orders_list.frame.winfo_exists():
+            entry = self._remove_order(order.id)
+            if entry is not None:
+                self._insert_orders([(order, entry[1])])
+        messagebox.showinfo("Sucesso", f"Status do pedido atualizado para: {new_status}")
     
     def _get_status_color(self, status):
         colors = {
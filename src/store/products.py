@@ -1,8 +1,23 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import messagebox, filedialog
 import sqlite3
 from pathlib import Path
 from src.services.database import get_db
+from src.services.catalog_cache import get_catalog_cache
+from src.services.image_service import create_thumbnail, thumbnail_key
+from src.services.asset_store import get_asset_store
+from src.services.image_loader import get_image_loader, bind_thumbnail
+from src.services.config import get_setting
+from src.components.virtual_list import VirtualList
+from src.utils.helpers import estimate_text_lines
+
+
+STORE_PRODUCTS_SQL = """
+    SELECT id, name, description, price, image_path, is_available
+    FROM products
+    WHERE store_id = ?
+    ORDER BY created_at DESC
+"""
 
 
 class StoreProductsPage:
@@ -12,6 +27,7 @@ class StoreProductsPage:
         self.user_data = user_data
         self.store_data = store_data
         self.dashboard_ref = dashboard_ref
+        self.thumb_size = get_setting("thumbnail_size")
         
         self._create_widgets()
         self._load_products()
@@ -43,140 +59,151 @@ class StoreProductsPage:
         )
         add_btn.pack(side="right", padx=10)
         
-        main_frame = tk.Frame(self.parent)
-        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
-        
-        canvas = tk.Canvas(main_frame, bg="white")
-        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg="white")
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        self.products_list = VirtualList(
+            self.parent,
+            create_row=self._create_product_row,
+            bind_row=self._bind_product_row,
+            row_height=self._product_row_height,
+            on_visible_change=self._on_visible_change
         )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        self.products_frame = scrollable_frame
+        self.products_list.pack(fill="both", expand=True, padx=20, pady=20)
     
     def _load_products(self):
-        for widget in self.products_frame.winfo_children():
-            widget.destroy()
-        
         db = get_db()
         conn = db.get_connection()
         cursor = conn.cursor()
         
         try:
-            cursor.execute("""
-                SELECT id, name, description, price, image_path, is_available
-                FROM products
-                WHERE store_id = ?
-                ORDER BY created_at DESC
-            """, (self.store_data['id'],))
+            cursor.execute(STORE_PRODUCTS_SQL, (self.store_data['id'],))
             
             products = cursor.fetchall()
             
+            self.products_list.set_items(products)
             if not products:
-                no_products_label = tk.Label(
-                    self.products_frame,
-                    text="Nenhum produto cadastrado ainda.\nClique em 'Adicionar Produto' para começar.",
-                    font=("Arial", 14),
-                    bg="white",
-                    fg="#757575"
-                )
-                no_products_label.pack(pady=50)
-                return
-            
-            for product in products:
-                product_frame = tk.Frame(self.products_frame, bg="white", relief="solid", bd=2)
-                product_frame.pack(fill="x", padx=10, pady=10)
-                
-                product_content = tk.Frame(product_frame, bg="white")
-                product_content.pack(fill="x", padx=15, pady=10)
-                
-                name_label = tk.Label(
-                    product_content,
-                    text=product['name'],
-                    font=("Arial", 16, "bold"),
-                    bg="white",
-                    anchor="w"
-                )
-                name_label.pack(fill="x", pady=(0, 5))
-                
-                if product['description']:
-                    desc_label = tk.Label(
-                        product_content,
-                        text=product['description'],
-                        font=("Arial", 10),
-                        bg="white",
-                        anchor="w",
-                        wraplength=600,
-                        fg="#424242"
-                    )
-                    desc_label.pack(fill="x", pady=(0, 5))
-                
-                bottom_frame = tk.Frame(product_content, bg="white")
-                bottom_frame.pack(fill="x")
-                
-                price_label = tk.Label(
-                    bottom_frame,
-                    text=f"R$ {product['price']:.2f}",
-                    font=("Arial", 14, "bold"),
-                    bg="white",
-                    fg="#4CAF50"
-                )
-                price_label.pack(side="left")
-                
-                status_label = tk.Label(
-                    bottom_frame,
-                    text="Disponível" if product['is_available'] else "Indisponível",
-                    font=("Arial", 10),
-                    bg="white",
-                    fg="#4CAF50" if product['is_available'] else "#F44336"
-                )
-                status_label.pack(side="left", padx=20)
-                
-                buttons_frame = tk.Frame(bottom_frame, bg="white")
-                buttons_frame.pack(side="right")
-                
-                edit_btn = tk.Button(
-                    buttons_frame,
-                    text="✏️ Editar",
-                    font=("Arial", 9),
-                    bg="#2196F3",
-                    fg="white",
-                    command=lambda pid=product['id']: self._open_edit_product(pid)
-                )
-                edit_btn.pack(side="left", padx=2)
-                
-                toggle_btn = tk.Button(
-                    buttons_frame,
-                    text="✅ Disponível" if not product['is_available'] else "❌ Indisponível",
-                    font=("Arial", 9),
-                    bg="#FF9800" if product['is_available'] else "#4CAF50",
-                    fg="white",
-                    command=lambda pid=product['id'], avail=product['is_available']: self._toggle_availability(pid, avail)
-                )
-                toggle_btn.pack(side="left", padx=2)
-                
-                delete_btn = tk.Button(
-                    buttons_frame,
-                    text="🗑️ Excluir",
-                    font=("Arial", 9),
-                    bg="#F44336",
-                    fg="white",
-                    command=lambda pid=product['id']: self._delete_product(pid)
-                )
-                delete_btn.pack(side="left", padx=2)
+                self.products_list.show_message("Nenhum produto cadastrado ainda.\nClique em 'Adicionar Produto' para começar.")
         
         except sqlite3.Error as e:
             messagebox.showerror("Erro", f"Erro ao carregar produtos: {str(e)}")
     
+    def _product_row_height(self, product):
+        height = 125 + 18 * estimate_text_lines(product['description'], 85)
+        if product['image_path']:
+            height = max(height, self.thumb_size + 45)
+        return height
+    
+    def _on_visible_change(self, visible):
+        items = self.products_list.items
+        get_image_loader().prioritize({
+            thumbnail_key(items[i]['image_path'], self.thumb_size)
+            for i in visible
+            if items[i]['image_path']
+        })
+    
+    def _create_product_row(self, parent, kind):
+        row = tk.Frame(parent, bg="white")
+        
+        product_frame = tk.Frame(row, bg="white", relief="solid", bd=2)
+        product_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        row.image_label = tk.Label(product_frame, bg="white")
+        
+        row.product_content = tk.Frame(product_frame, bg="white")
+        row.product_content.pack(side="left", fill="both", expand=True, padx=15, pady=10)
+        
+        row.name_label = tk.Label(
+            row.product_content,
+            font=("Arial", 16, "bold"),
+            bg="white",
+            anchor="w"
+        )
+        row.name_label.pack(fill="x", pady=(0, 5))
+        
+        row.desc_label = tk.Label(
+            row.product_content,
+            font=("Arial", 10),
+            bg="white",
+            anchor="w",
+            justify="left",
+            wraplength=600,
+            fg="#424242"
+        )
+        
+        bottom_frame = tk.Frame(row.product_content, bg="white")
+        bottom_frame.pack(fill="x")
+        
+        row.price_label = tk.Label(
+            bottom_frame,
+            font=("Arial", 14, "bold"),
+            bg="white",
+            fg="#4CAF50"
+        )
+        row.price_label.pack(side="left")
+        
+        row.status_label = tk.Label(
+            bottom_frame,
+            font=("Arial", 10),
+            bg="white"
+        )
+        row.status_label.pack(side="left", padx=20)
+        
+        buttons_frame = tk.Frame(bottom_frame, bg="white")
+        buttons_frame.pack(side="right")
+        
+        row.edit_btn = tk.Button(
+            buttons_frame,
+            text="✏️ Editar",
+            font=("Arial", 9),
+            bg="#2196F3",
+            fg="white"
+        )
+        row.edit_btn.pack(side="left", padx=2)
+        
+        row.toggle_btn = tk.Button(
+            buttons_frame,
+            font=("Arial", 9),
+            fg="white"
+        )
+        row.toggle_btn.pack(side="left", padx=2)
+        
+        row.delete_btn = tk.Button(
+            buttons_frame,
+            text="🗑️ Excluir",
+            font=("Arial", 9),
+            bg="#F44336",
+            fg="white"
+        )
+        row.delete_btn.pack(side="left", padx=2)
+        return row
+    
+    def _bind_product_row(self, row, product):
+        if product['image_path']:
+            bind_thumbnail(row.image_label, product['image_path'], self.thumb_size)
+            row.image_label.pack(side="left", padx=(15, 0), pady=10, before=row.product_content)
+        else:
+            row.image_label.image_key = None
+            row.image_label.pack_forget()
+        
+        row.name_label.config(text=product['name'])
+        if product['description']:
+            row.desc_label.config(text=product['description'])
+            row.desc_label.pack(fill="x", pady=(0, 5), after=row.name_label)
+        else:
+            row.desc_label.pack_forget()
+        
+        row.price_label.config(text=f"R$ {product['price']:.2f}")
+        row.status_label.config(
+            text="Disponível" if product['is_available'] else "Indisponível",
+            fg="#4CAF50" if product['is_available'] else "#F44336"
+        )
+        
+        row.edit_btn.config(command=lambda pid=product['id']: self._open_edit_product(pid))
+        row.toggle_btn.config(
+            text="✅ Disponível" if not product['is_available'] else "❌ Indisponível",
+            bg="#FF9800" if product['is_available'] else "#4CAF50",
+            command=lambda pid=product['id'], avail=product['is_available']: self._toggle_availability(pid, avail)
+        )
+        row.delete_btn.config(command=lambda pid=product['id']: self._delete_product(pid))
+    
     def _open_add_product(self):
         AddProductWindow(self.parent.winfo_toplevel(), self.store_data, self)
     
@@ -197,6 +224,7 @@ class StoreProductsPage:
             """, (new_status, product_id, self.store_data['id']))
             
             conn.commit()
+            get_catalog_cache().invalidate_store(self.store_data['id'])
             messagebox.showinfo("Sucesso", "Status do produto atualizado!")
             self._load_products()
         
@@ -218,6 +246,7 @@ class StoreProductsPage:
             """, (product_id, self.store_data['id']))
             
             conn.commit()
+            get_catalog_cache().invalidate_store(self.store_data['id'])
             messagebox.showinfo("Sucesso", "Produto excluído com sucesso!")
             self._load_products()
         
@@ -355,15 +384,10 @@ class AddProductWindow:
         try:
             image_path_db = None
             if self.image_path:
-                products_dir = Path(__file__).parent.parent.parent / "assets" / "products"
-                products_dir.mkdir(parents=True, exist_ok=True)
-                
-                import shutil
-                file_ext = Path(self.image_path).suffix
-                new_filename = f"{self.store_data['id']}_{name.replace(' ', '_')}{file_ext}"
-                new_path = products_dir / new_filename
-                shutil.copy2(self.image_path, new_path)
-                image_path_db = str(new_path)
+                # Arquivo gravado pelo hash do conteúdo; o banco guarda a chave relativa
+                image_path_db = get_asset_store().put(self.image_path)
+                # Miniatura gerada no upload: as listagens não decodificam o original
+                create_thumbnail(get_asset_store().path(image_path_db))
             
             cursor.execute("""
                 INSERT INTO products (store_id, name, description, price, image_path)
@@ -371,6 +395,7 @@ class AddProductWindow:
             """, (self.store_data['id'], name, description if description else None, price, image_path_db))
             
             conn.commit()
+            get_catalog_cache().invalidate_store(self.store_data['id'])
             messagebox.showinfo("Sucesso", "Produto adicionado com sucesso!")
             self.window.destroy()
             if self.products_page_ref:
@@ -540,15 +565,8 @@ class EditProductWindow:
         try:
             image_path_db = self.product_data.get('image_path')
             if self.image_path:
-                products_dir = Path(__file__).parent.parent.parent / "assets" / "products"
-                products_dir.mkdir(parents=True, exist_ok=True)
-                
-                import shutil
-                file_ext = Path(self.image_path).suffix
-                new_filename = f"{self.store_data['id']}_{name.replace(' ', '_')}{file_ext}"
-                new_path = products_dir / new_filename
-                shutil.copy2(self.image_path, new_path)
-                image_path_db = str(new_path)
+                image_path_db = get_asset_store().put(self.image_path)
+                create_thumbnail(get_asset_store().path(image_path_db))
             
             cursor.execute("""
                 UPDATE products 
@@ -557,6 +575,7 @@ class EditProductWindow:
             """, (name, description if description else None, price, image_path_db, self.product_id, self.store_data['id']))
             
             conn.commit()
+            get_catalog_cache().invalidate_store(self.store_data['id'])
             messagebox.showinfo("Sucesso", "Produto atualizado com sucesso!")
             self.window.destroy()
             if self.products_page_ref:
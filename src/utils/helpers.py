@@ -17,3 +17,12 @@ def get_assets_path(subfolder=""):
         assets_path = assets_path / subfolder
     ensure_dir(assets_path)
     return assets_path
+
+
+def estimate_text_lines(text, chars_per_line):
+    if not text:
+        return 0
+    lines = 0
+    for line in str(text).split("\n"):
+        lines += max(1, -(-len(line) // chars_per_line))
+    return lines